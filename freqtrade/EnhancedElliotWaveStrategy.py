@@ -173,11 +173,6 @@ class EnhancedElliotWaveStrategy(IStrategy):
                     dataframe, best_impulse.get('wave_pattern'), prefix='ew'
                 )
 
-                # Calculate confidence score
-                dataframe['ew_confidence'] = self.wave_helper.calculate_confidence_score(
-                    dataframe, prefix='ew'
-                )
-
                 self.dp.send_msg(
                     f"Found Elliott Wave pattern for {metadata['pair']}: "
                     f"Probability {best_probability:.1f}%"
@@ -186,7 +181,6 @@ class EnhancedElliotWaveStrategy(IStrategy):
                 # Initialize empty indicators
                 dataframe['ew_probability'] = 0
                 dataframe['ew_fib_score'] = 0
-                dataframe['ew_confidence'] = 0
                 dataframe['ew_target_1'] = np.nan
                 dataframe['ew_target_2'] = np.nan
                 dataframe['ew_target_3'] = np.nan
@@ -196,7 +190,17 @@ class EnhancedElliotWaveStrategy(IStrategy):
             # Initialize empty indicators on error
             dataframe['ew_probability'] = 0
             dataframe['ew_fib_score'] = 0
-            dataframe['ew_confidence'] = 0
+
+        # Confidence score (0 where no pattern was found), computed in one pass
+        # over the probability and Fibonacci score columns
+        confidence, _ = self.wave_helper.calculate_confidence_and_entry(
+            dataframe,
+            min_probability=self.min_wave_probability.value,
+            min_fib_score=self.min_fibonacci_score.value,
+            wave_type=None,
+            prefix='ew'
+        )
+        dataframe['ew_confidence'] = confidence
 
         # Add standard technical indicators for confirmation
         # Volume
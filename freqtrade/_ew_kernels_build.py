@@ -0,0 +1,34 @@
+"""
+Ahead-of-time build of the Elliott Wave kernels
+
+Compiles the kernels of freqtrade/elliott_wave_kernels.py into the extension
+module freqtrade/_ew_kernels, so strategies skip the JIT warm-up on load and
+every hyperopt worker runs the same machine code.
+
+Usage (from the repository root):
+    python -m freqtrade._ew_kernels_build
+
+elliott_wave_kernels.py picks up the compiled module automatically and falls
+back to the @njit kernels if it has not been built.
+
+numba.pycc is pending deprecation since Numba 0.57; this build is known to
+work with numba>=0.57,<0.69. The platform-tagged output is git-ignored
+(/freqtrade/_ew_kernels.*) and has to be rebuilt after a Numba or Python
+upgrade.
+"""
+
+from pathlib import Path
+
+from numba.pycc import CC
+
+from freqtrade.elliott_wave_kernels import _conf_and_mask, _fill_wave_points
+
+cc = CC('_ew_kernels')
+cc.output_dir = str(Path(__file__).resolve().parent)
+
+cc.export('conf_and_mask', 'Tuple((f8[:], b1[:]))(f8[:], f8[:], i1[:], f8[:], f8, f8, i8)')(_conf_and_mask.py_func)
+cc.export('fill_wave_points', 'void(f8[:, :, :], i8[:], i8[:], i8[:], f8[:], f8[:])')(_fill_wave_points.py_func)
+
+
+if __name__ == '__main__':
+    cc.compile()
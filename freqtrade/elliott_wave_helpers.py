@@ -10,6 +10,20 @@ import pandas as pd
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
+from freqtrade.elliott_wave_kernels import conf_and_mask, fill_wave_points
+
+
+# Subplot layout for create_plot_config: (subplot name, ((indicator suffix, style), ...))
+_PLOT_SUBPLOTS = (
+    ("Elliott Wave Probability", (
+        ('_probability', {'color': 'blue', 'type': 'line'}),
+        ('_fib_score', {'color': 'green', 'type': 'line'}),
+    )),
+    ("Confidence Score", (
+        ('_confidence', {'color': 'purple', 'type': 'line'}),
+    )),
+)
+
 
 class FreqtradeElliotWaveHelper:
     """
@@ -31,65 +45,131 @@ class FreqtradeElliotWaveHelper:
         Returns:
             Dataframe with added indicators
         """
-        # Initialize all indicators to NaN
-        dataframe[f'{prefix}_probability'] = np.nan
-        dataframe[f'{prefix}_wave_type'] = ''
-        dataframe[f'{prefix}_target_1'] = np.nan
-        dataframe[f'{prefix}_target_2'] = np.nan
-        dataframe[f'{prefix}_target_3'] = np.nan
-        dataframe[f'{prefix}_invalidation'] = np.nan
-        dataframe[f'{prefix}_fib_score'] = np.nan
-        dataframe[f'{prefix}_pattern_quality'] = ''
+        n = len(dataframe)
+
+        # Targets 1-3 and the invalidation level share one buffer (one row per column)
+        levels = np.full((4, n), np.nan)
+
+        # Initialize all indicators (NaN / empty) and add them in a single batch
+        indicators = {
+            f'{prefix}_probability': np.full(n, np.nan),
+            f'{prefix}_wave_type': np.full(n, '', dtype=object),
+            f'{prefix}_target_1': levels[0],
+            f'{prefix}_target_2': levels[1],
+            f'{prefix}_target_3': levels[2],
+            f'{prefix}_invalidation': levels[3],
+            f'{prefix}_fib_score': np.full(n, np.nan),
+            f'{prefix}_pattern_quality': np.full(n, '', dtype=object),
+        }
 
         if not wave_analysis.get('found', False):
-            return dataframe
+            return FreqtradeElliotWaveHelper._add_columns(dataframe, indicators)
 
         # Get pattern details
         probability = wave_analysis.get('overall_probability', 0)
         pattern = wave_analysis.get('wave_pattern')
 
         if pattern is None:
-            return dataframe
+            return FreqtradeElliotWaveHelper._add_columns(dataframe, indicators)
 
         # Mark the wave pattern on the dataframe
         start_idx = pattern.idx_start
         end_idx = pattern.idx_end
 
-        if end_idx is not None and end_idx < len(dataframe):
-            # Set probability across the pattern range
-            dataframe.loc[start_idx:end_idx, f'{prefix}_probability'] = probability
-            dataframe.loc[start_idx:end_idx, f'{prefix}_wave_type'] = wave_analysis.get('wave_type', '')
+        if end_idx is None or end_idx >= n:
+            return FreqtradeElliotWaveHelper._add_columns(dataframe, indicators)
+
+        # Indices may come in as NumPy scalars, slice with plain ints
+        start_idx = int(start_idx)
+        end_idx = int(end_idx)
+
+        # Positions are written straight into the indicator arrays, so a non-default
+        # dataframe index does not change where the pattern lands
+
+        # Set probability and wave type across the pattern range
+        indicators[f'{prefix}_probability'][start_idx:end_idx + 1] = probability
+        indicators[f'{prefix}_wave_type'][start_idx:end_idx + 1] = wave_analysis.get('wave_type', '')
 
-            # Set pattern quality category
-            category = wave_analysis.get('category', '')
-            dataframe.loc[start_idx:end_idx, f'{prefix}_pattern_quality'] = category
+        # Set pattern quality category
+        category = wave_analysis.get('category', '')
+        indicators[f'{prefix}_pattern_quality'][start_idx:end_idx + 1] = category
 
-            # Add Fibonacci score
-            fib_score = wave_analysis['probability_analysis']['scores']['fibonacci_ratios']['score']
-            dataframe.loc[start_idx:end_idx, f'{prefix}_fib_score'] = fib_score
+        # Add Fibonacci score
+        fib_score = wave_analysis['probability_analysis']['scores']['fibonacci_ratios']['score']
+        indicators[f'{prefix}_fib_score'][start_idx:end_idx + 1] = fib_score
 
-            # Add targets if available
-            if 'targets' in wave_analysis:
-                targets = wave_analysis['targets']['targets']
+        # Add targets if available
+        if 'targets' in wave_analysis:
+            targets = wave_analysis['targets']['targets']
+
+            # Get top 3 most probable targets
+            sorted_targets = sorted(targets, key=lambda x: x.get('probability', 0), reverse=True)
+
+            top_prices = [target['price'] for target in sorted_targets[:3]]
+            if top_prices:
+                levels[:len(top_prices), end_idx:] = np.asarray(top_prices, dtype=np.float64)[:, None]
 
-                # Get top 3 most probable targets
-                sorted_targets = sorted(targets, key=lambda x: x.get('probability', 0), reverse=True)
+            # Add invalidation level if present
+            for target in targets:
+                if target.get('level') == 'invalidation':
+                    levels[3, end_idx:] = target['price']
+                    break
 
-                if len(sorted_targets) >= 1:
-                    dataframe.loc[end_idx:, f'{prefix}_target_1'] = sorted_targets[0]['price']
-                if len(sorted_targets) >= 2:
-                    dataframe.loc[end_idx:, f'{prefix}_target_2'] = sorted_targets[1]['price']
-                if len(sorted_targets) >= 3:
-                    dataframe.loc[end_idx:, f'{prefix}_target_3'] = sorted_targets[2]['price']
+        return FreqtradeElliotWaveHelper._add_columns(dataframe, indicators)
 
-                # Add invalidation level if present
-                for target in targets:
-                    if target.get('level') == 'invalidation':
-                        dataframe.loc[end_idx:, f'{prefix}_invalidation'] = target['price']
-                        break
+    @staticmethod
+    def _add_columns(dataframe: pd.DataFrame, columns: Dict) -> pd.DataFrame:
+        """
+        Add several columns at once and return the resulting dataframe.
+
+        New columns are joined with a single concat instead of one setitem each, columns that
+        already exist are replaced through assign. dataframe.attrs is carried over.
+        """
+        existing = {col: values for col, values in columns.items() if col in dataframe.columns}
+        new = {col: values for col, values in columns.items() if col not in dataframe.columns}
+
+        attrs = dict(dataframe.attrs)
+        if existing:
+            dataframe = dataframe.assign(**existing)
+        if new:
+            dataframe = pd.concat([dataframe, pd.DataFrame(new, index=dataframe.index, copy=False)], axis=1)
+        dataframe.attrs = attrs
 
         return dataframe
 
+    @staticmethod
+    def _waves_to_soa(wave_pattern) -> Dict:
+        """
+        Extract the endpoints of all waves in a WavePattern into one array per attribute
+        (wave number, label, direction, high/low index and high/low price). Missing indices are -1.
+        """
+        nums, labels, directions, high_idxs, low_idxs, highs, lows = [], [], [], [], [], [], []
+
+        for wave_num, wave in wave_pattern.waves.items():
+            high_idx = getattr(wave, 'high_idx', None)
+            low_idx = getattr(wave, 'low_idx', None)
+
+            nums.append(wave_num.replace('wave', ''))
+            labels.append(getattr(wave, 'label', None))
+            direction = getattr(wave, 'direction', None)
+            if direction is None:
+                direction = 1 if high_idx is not None and low_idx is not None and wave.high > wave.low else -1
+            directions.append(direction)
+            high_idxs.append(-1 if high_idx is None else high_idx)
+            low_idxs.append(-1 if low_idx is None else low_idx)
+            highs.append(np.nan if high_idx is None else wave.high)
+            lows.append(np.nan if low_idx is None else wave.low)
+
+        return {
+            'num': nums,
+            'label': labels,
+            'direction': np.asarray(directions, dtype=np.int8),
+            'high_idx': np.asarray(high_idxs, dtype=np.int64),
+            'low_idx': np.asarray(low_idxs, dtype=np.int64),
+            'high': np.asarray(highs, dtype=np.float64),
+            'low': np.asarray(lows, dtype=np.float64),
+        }
+
     @staticmethod
     def mark_wave_points(dataframe: pd.DataFrame,
                         wave_pattern,
@@ -105,24 +185,68 @@ class FreqtradeElliotWaveHelper:
         Returns:
             Dataframe with wave point markers
         """
-        # Initialize wave point columns
+        n = len(dataframe)
+
+        # Wave point columns are views into one buffer: points[wave - 1, 0 = high / 1 = low]
+        points = np.full((5, 2, n), np.nan)
+        wave_points = {}
         for i in range(1, 6):
-            dataframe[f'{prefix}_wave{i}_high'] = np.nan
-            dataframe[f'{prefix}_wave{i}_low'] = np.nan
+            wave_points[f'{prefix}_wave{i}_high'] = points[i - 1, 0]
+            wave_points[f'{prefix}_wave{i}_low'] = points[i - 1, 1]
+
+        if wave_pattern is not None:
+            waves = FreqtradeElliotWaveHelper._waves_to_soa(wave_pattern)
+
+            # Mark each wave's high and low points
+            rows = np.asarray([int(num) - 1 for num in waves['num']], dtype=np.int64)
+            fill_wave_points(points, rows, waves['high_idx'], waves['low_idx'], waves['high'], waves['low'])
+
+        return FreqtradeElliotWaveHelper._add_columns(dataframe, wave_points)
+
+    @staticmethod
+    def update_wave_points(dataframe: pd.DataFrame,
+                           wave_pattern,
+                           prefix: str = 'ew') -> pd.DataFrame:
+        """
+        Mark wave endpoints on a dataframe that already has the wave point columns.
+
+        The marks of the previous pattern are cleared over the range they span and
+        only the new endpoint cells are written, so calling this on every new candle
+        does not re-allocate the columns. The result matches mark_wave_points.
+        Falls back to mark_wave_points if the columns are missing.
+
+        Args:
+            dataframe: Freqtrade dataframe
+            wave_pattern: WavePattern object
+            prefix: Prefix for columns
+
+        Returns:
+            Dataframe with wave point markers
+        """
+        columns = [f'{prefix}_wave{i}_{side}' for i in range(1, 6) for side in ('high', 'low')]
+        if not all(col in dataframe.columns for col in columns):
+            return FreqtradeElliotWaveHelper.mark_wave_points(dataframe, wave_pattern, prefix)
+
+        # Clear the previous pattern, from its first to its last marked row
+        positions = [dataframe.columns.get_loc(col) for col in columns]
+        marked = np.flatnonzero(dataframe.iloc[:, positions].notna().to_numpy().any(axis=1))
+        if len(marked):
+            dataframe.iloc[marked[0]:marked[-1] + 1, positions] = np.nan
 
         if wave_pattern is None:
             return dataframe
 
-        # Mark each wave's high and low points
-        for wave_num, wave in wave_pattern.waves.items():
-            # Extract number from wave_num (e.g., 'wave1' -> 1)
-            num = wave_num.replace('wave', '')
+        n = len(dataframe)
+        waves = FreqtradeElliotWaveHelper._waves_to_soa(wave_pattern)
 
-            if hasattr(wave, 'high_idx') and wave.high_idx < len(dataframe):
-                dataframe.loc[wave.high_idx, f'{prefix}_wave{num}_high'] = wave.high
+        for side in ('high', 'low'):
+            idx = waves[f'{side}_idx']
 
-            if hasattr(wave, 'low_idx') and wave.low_idx < len(dataframe):
-                dataframe.loc[wave.low_idx, f'{prefix}_wave{num}_low'] = wave.low
+            # Only visit waves whose endpoint lies inside the dataframe
+            for k in np.flatnonzero((idx >= 0) & (idx < n)):
+                col = f'{prefix}_wave{waves["num"][k]}_{side}'
+                if col in dataframe.columns:
+                    dataframe.iloc[int(idx[k]), dataframe.columns.get_loc(col)] = waves[side][k]
 
         return dataframe
 
@@ -153,8 +277,9 @@ class FreqtradeElliotWaveHelper:
         # Check if Fibonacci score meets threshold
         conditions.append(dataframe[f'{prefix}_fib_score'] >= min_fib_score)
 
-        # Check wave type
-        conditions.append(dataframe[f'{prefix}_wave_type'] == wave_type)
+        # Check wave type (plain array compare, no object-dtype Series round trip)
+        is_wave_type = dataframe[f'{prefix}_wave_type'].to_numpy() == wave_type
+        conditions.append(pd.Series(is_wave_type, index=dataframe.index))
 
         # Check that we have a valid target
         conditions.append(dataframe[f'{prefix}_target_1'].notna())
@@ -226,6 +351,63 @@ class FreqtradeElliotWaveHelper:
 
         return confidence
 
+    @staticmethod
+    def calculate_confidence_and_entry(dataframe: pd.DataFrame,
+                                       min_probability: float = 70.0,
+                                       min_fib_score: float = 60.0,
+                                       wave_type: Optional[str] = 'impulse',
+                                       prefix: str = 'ew') -> Tuple[pd.Series, pd.Series]:
+        """
+        Calculate the confidence score and the Elliott Wave entry conditions together.
+
+        Reads the probability and Fibonacci score columns once instead of once for
+        calculate_confidence_score and once more for generate_entry_signal.
+
+        Args:
+            dataframe: Freqtrade dataframe with wave indicators
+            min_probability: Minimum pattern probability
+            min_fib_score: Minimum Fibonacci score
+            wave_type: Type of wave to look for (None to skip the check)
+            prefix: Indicator prefix
+
+        Returns:
+            Tuple of (confidence score series, entry signal series)
+        """
+        n = len(dataframe)
+        prob_col = f'{prefix}_probability'
+        fib_col = f'{prefix}_fib_score'
+        target_col = f'{prefix}_target_1'
+
+        if prob_col not in dataframe.columns or fib_col not in dataframe.columns:
+            return (pd.Series(np.zeros(n), index=dataframe.index),
+                    pd.Series(np.zeros(n, dtype=bool), index=dataframe.index))
+
+        if target_col in dataframe.columns:
+            target_1 = dataframe[target_col].to_numpy(dtype=np.float64)
+        else:
+            target_1 = np.full(n, np.nan)
+
+        wave_type_col = f'{prefix}_wave_type'
+        if wave_type is None or wave_type_col not in dataframe.columns:
+            codes = np.zeros(n, dtype=np.int8)
+            target_code = 0
+        else:
+            codes = (dataframe[wave_type_col].to_numpy() == wave_type).view(np.int8)
+            target_code = 1
+
+        confidence, entry = conf_and_mask(
+            dataframe[prob_col].to_numpy(dtype=np.float64),
+            dataframe[fib_col].to_numpy(dtype=np.float64),
+            np.ascontiguousarray(codes, dtype=np.int8),
+            target_1,
+            float(min_probability),
+            float(min_fib_score),
+            target_code
+        )
+
+        return (pd.Series(confidence, index=dataframe.index),
+                pd.Series(entry, index=dataframe.index))
+
     @staticmethod
     def add_wave_labels(dataframe: pd.DataFrame,
                        wave_pattern,
@@ -241,26 +423,21 @@ class FreqtradeElliotWaveHelper:
         Returns:
             Dataframe with wave labels
         """
-        dataframe[f'{prefix}_label'] = ''
+        n = len(dataframe)
+        labels = np.full(n, '', dtype=object)
 
-        if wave_pattern is None:
-            return dataframe
+        if wave_pattern is not None:
+            waves = FreqtradeElliotWaveHelper._waves_to_soa(wave_pattern)
 
-        # Add labels at wave endpoints
-        for wave_num, wave in wave_pattern.waves.items():
-            label = wave.label if hasattr(wave, 'label') else wave_num.replace('wave', '')
-
-            # Place label at the endpoint (high for up waves, low for down waves)
-            if hasattr(wave, 'high_idx') and hasattr(wave, 'low_idx'):
-                # Determine if it's an up wave or down wave
-                if wave.high > wave.low:  # Up wave - label at high
-                    if wave.high_idx < len(dataframe):
-                        dataframe.loc[wave.high_idx, f'{prefix}_label'] = label
-                else:  # Down wave - label at low
-                    if wave.low_idx < len(dataframe):
-                        dataframe.loc[wave.low_idx, f'{prefix}_label'] = label
+            # Place labels at the endpoint (high for up waves, low for down waves)
+            has_both = (waves['high_idx'] >= 0) & (waves['low_idx'] >= 0)
+            label_idx = np.where(waves['direction'] > 0, waves['high_idx'], waves['low_idx'])
 
-        return dataframe
+            for k in np.flatnonzero(has_both & (label_idx < n)):
+                label = waves['label'][k]
+                labels[label_idx[k]] = waves['num'][k] if label is None else label
+
+        return FreqtradeElliotWaveHelper._add_columns(dataframe, {f'{prefix}_label': labels})
 
     @staticmethod
     def create_plot_config(prefix: str = 'ew') -> Dict:
@@ -276,13 +453,8 @@ class FreqtradeElliotWaveHelper:
         return {
             'main_plot': {},
             'subplots': {
-                "Elliott Wave Probability": {
-                    f'{prefix}_probability': {'color': 'blue', 'type': 'line'},
-                    f'{prefix}_fib_score': {'color': 'green', 'type': 'line'},
-                },
-                "Confidence Score": {
-                    f'{prefix}_confidence': {'color': 'purple', 'type': 'line'},
-                }
+                subplot: {f'{prefix}{suffix}': dict(style) for suffix, style in indicators}
+                for subplot, indicators in _PLOT_SUBPLOTS
             }
         }
 
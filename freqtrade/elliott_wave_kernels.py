@@ -0,0 +1,72 @@
+"""
+Numba kernels for the Freqtrade Elliott Wave helpers
+
+The helpers call these on plain float64 / int8 column arrays so that each
+indicator column is read once per candle sweep.
+
+If the ahead-of-time build (freqtrade/_ew_kernels_build.py) has been run,
+the compiled kernels replace the @njit versions at import time.
+"""
+
+from numba import njit
+import numpy as np
+
+
+@njit
+def _conf_and_mask(prob: np.array, fib: np.array, wave_type_codes: np.array, target_1: np.array,
+                  min_probability: float, min_fib_score: float, target_code: int):
+    """
+    Computes the confidence score and the entry mask in a single pass.
+
+    Confidence is 60% probability + 40% Fibonacci score (0 where either is NaN). A candle is an entry
+    when probability and Fibonacci score meet their thresholds, the wave type code matches and a
+    first target is set.
+
+    :return: confidence, mask
+    """
+    n = prob.shape[0]
+    confidence = np.zeros(n)
+    mask = np.zeros(n, dtype=np.bool_)
+
+    for i in range(n):
+        p = prob[i]
+        f = fib[i]
+
+        c = p * 0.6 + f * 0.4
+        if c == c:
+            confidence[i] = c
+
+        if p >= min_probability and f >= min_fib_score and \
+                target_code >= 0 and wave_type_codes[i] == target_code and target_1[i] == target_1[i]:
+            mask[i] = True
+
+    return confidence, mask
+
+
+@njit
+def _fill_wave_points(points: np.array, rows: np.array, high_idx: np.array, low_idx: np.array,
+                      highs: np.array, lows: np.array):
+    """
+    Writes each wave's high and low price into points[row, 0] and points[row, 1] at the
+    wave's high and low index. Waves whose row or index is out of range are skipped.
+    """
+    n_rows = points.shape[0]
+    n = points.shape[2]
+
+    for k in range(rows.shape[0]):
+        r = rows[k]
+        if r < 0 or r >= n_rows:
+            continue
+
+        if 0 <= high_idx[k] < n:
+            points[r, 0, high_idx[k]] = highs[k]
+
+        if 0 <= low_idx[k] < n:
+            points[r, 1, low_idx[k]] = lows[k]
+
+
+try:
+    from freqtrade._ew_kernels import conf_and_mask, fill_wave_points
+except ImportError:
+    conf_and_mask = _conf_and_mask
+    fill_wave_points = _fill_wave_points
@@ -26,21 +26,19 @@ def create_sample_dataframe(num_candles=200):
 
     # Create realistic price movement
     np.random.seed(42)
-    close_prices = []
-    price = 50000.0
 
-    for i in range(num_candles):
-        # Random walk with slight upward bias
-        change = np.random.randn() * 500 + 50
-        price += change
-        price = max(price, 10000)  # Floor
-        close_prices.append(price)
+    # Random walk with slight upward bias
+    changes = np.random.randn(num_candles) * 500 + 50
+    walk = 50000.0 + np.cumsum(changes)
+
+    # Floor at 10000 (reflecting the walk lifts every later price by the same amount)
+    close_prices = walk + np.maximum(np.maximum.accumulate(10000 - walk), 0)
 
     df = pd.DataFrame({
         'date': dates,
-        'open': [p * 0.99 for p in close_prices],
-        'high': [p * 1.02 for p in close_prices],
-        'low': [p * 0.98 for p in close_prices],
+        'open': close_prices * 0.99,
+        'high': close_prices * 1.02,
+        'low': close_prices * 0.98,
         'close': close_prices,
         'volume': np.random.randint(1000000, 10000000, size=num_candles)
     })
@@ -8,19 +8,41 @@ This module provides a comprehensive Elliott Wave analysis system that:
 - Provides segment length variation analysis
 """
 
+import heapq
 import numpy as np
 import pandas as pd
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from operator import attrgetter
 from typing import Dict, List, Optional, Tuple
-from models.MonoWave import MonoWaveUp, MonoWaveDown
+from models.MonoWave import MonoWaveUp, MonoWaveDown, MonoWaveArrays
 from models.WavePattern import WavePattern
 from models.WaveRules import Impulse, Correction, LeadingDiagonal, TDWave
-from models.WaveOptions import WaveOptionsGenerator5, WaveOptionsGenerator3
 from models.FibonacciAnalyzer import FibonacciAnalyzer
 from models.ProbabilityScorer import ProbabilityScorer
 from models.TargetCalculator import TargetCalculator
 from models.WaveCycle import WaveCycle
 
 
+# (MonoWave class, label) of each wave in an impulse (12345) and a correction (ABC)
+IMPULSE_WAVES = ((MonoWaveUp, '1'), (MonoWaveDown, '2'), (MonoWaveUp, '3'), (MonoWaveDown, '4'), (MonoWaveUp, '5'))
+CORRECTIVE_WAVES = ((MonoWaveDown, 'A'), (MonoWaveUp, 'B'), (MonoWaveDown, 'C'))
+
+
+# Analyzer of a scan_entire_dataset worker process
+_scan_analyzer = None
+
+
+def _init_scan_worker(analyzer):
+    global _scan_analyzer
+    _scan_analyzer = analyzer
+
+
+def _scan_worker_best_candidate(idx: int, wave_type: str, target_probability: Optional[float]):
+    return _scan_analyzer._best_candidate(idx, wave_type, target_probability)
+
+
 class WaveCandidate:
     """Represents a wave pattern candidate with probability score."""
 
@@ -45,6 +67,12 @@ class EnhancedWaveAnalyzer:
     target calculation, and multi-timeframe support.
     """
 
+    # Number of MonoWaves kept in the _get_monowave cache (least recently used are dropped)
+    _MONOWAVE_CACHE_SIZE = 65536
+
+    # Number of find_best_impulse_waves / find_best_corrective_waves results kept in their cache
+    _CANDIDATES_CACHE_SIZE = 1024
+
     def __init__(self, df: pd.DataFrame, verbose: bool = False,
                  min_probability: float = 50.0):
         """
@@ -56,12 +84,19 @@ class EnhancedWaveAnalyzer:
             min_probability: Minimum probability threshold for valid patterns (default 50%)
         """
         self.df = df
-        self.lows = np.array(list(self.df['Low']))
-        self.highs = np.array(list(self.df['High']))
-        self.dates = np.array(list(self.df['Date']))
+        self.lows = self.df['Low'].to_numpy(dtype=np.float64)
+        self.highs = self.df['High'].to_numpy(dtype=np.float64)
+        self.closes = self.df['Close'].to_numpy(dtype=np.float64)
+        self.dates = self.df['Date'].to_numpy(dtype=object)
         self.verbose = verbose
         self.min_probability = min_probability
 
+        # Sparse table for range minimum queries on the lows, see _min_low
+        self._low_table = [self.lows]
+        while 2 ** len(self._low_table) <= len(self.lows):
+            prev, half = self._low_table[-1], 2 ** (len(self._low_table) - 1)
+            self._low_table.append(np.minimum(prev[:-half], prev[half:]))
+
         # Analyzers
         self.fib_analyzer = FibonacciAnalyzer()
         self.prob_scorer = ProbabilityScorer()
@@ -72,12 +107,34 @@ class EnhancedWaveAnalyzer:
         self.correction_rule = Correction('correction')
         self.diagonal_rule = LeadingDiagonal('leading_diagonal')
 
-        # Wave options generators
-        self.__waveoptions_impulse: WaveOptionsGenerator5 = None
-        self.__waveoptions_correction: WaveOptionsGenerator3 = None
+        # Wave options (as generated by WaveOptionsGenerator5 / WaveOptionsGenerator3), one sorted row each
+        self._impulse_options: np.ndarray = None
+        self._correction_options: np.ndarray = None
+
+        # MonoWaves by (label, idx_start, skip), shared by all wave options and start indices
+        self._monowave_cache: OrderedDict = OrderedDict()
+
+        # Results of find_best_impulse_waves / find_best_corrective_waves by their arguments
+        self._candidates_cache: OrderedDict = OrderedDict()
 
         self.set_combinatorial_limits()
 
+    def __getstate__(self):
+        # The wave rules hold lambdas and cannot be pickled (scan_entire_dataset with n_jobs > 1), rebuild them
+        # instead. The MonoWave and candidate caches are left out as well, they are refilled on use.
+        state = self.__dict__.copy()
+        for rule in ('impulse_rule', 'correction_rule', 'diagonal_rule'):
+            del state[rule]
+        state['_monowave_cache'] = OrderedDict()
+        state['_candidates_cache'] = OrderedDict()
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.impulse_rule = Impulse('impulse')
+        self.correction_rule = Correction('correction')
+        self.diagonal_rule = LeadingDiagonal('leading_diagonal')
+
     def set_combinatorial_limits(self, n_impulse: int = 12, n_correction: int = 12):
         """
         Set limits for wave option combinations.
@@ -86,94 +143,131 @@ class EnhancedWaveAnalyzer:
             n_impulse: Maximum skip value for impulse waves (5 waves)
             n_correction: Maximum skip value for corrective waves (3 waves)
         """
-        self.__waveoptions_impulse = WaveOptionsGenerator5(n_impulse)
-        self.__waveoptions_correction = WaveOptionsGenerator3(n_correction)
+        self._impulse_options = self._build_option_matrix(n_impulse, 5)
+        self._correction_options = self._build_option_matrix(n_correction, 3)
+        self._monowave_cache.clear()
+        self._candidates_cache.clear()
+
+        # Wave options as prefix trees, so a wave that cannot be found skips all options sharing its prefix
+        self._impulse_option_tree = self._build_option_tree(self._impulse_options)
+        self._correction_option_tree = self._build_option_tree(self._correction_options)
 
         if self.verbose:
-            print(f"Impulse combinations: {self.__waveoptions_impulse.number:,}")
-            print(f"Correction combinations: {self.__waveoptions_correction.number:,}")
+            print(f"Impulse combinations: {len(self._impulse_options):,}")
+            print(f"Correction combinations: {len(self._correction_options):,}")
 
-    def find_best_impulse_waves(self, idx_start: int, max_results: int = 10) -> List[WaveCandidate]:
+    def find_best_impulse_waves(self, idx_start: int, max_results: int = 10,
+                                target_probability: Optional[float] = None) -> List[WaveCandidate]:
         """
         Find the best impulse wave patterns starting from idx_start.
 
-        Returns patterns sorted by probability score.
+        Returns patterns sorted by probability score. The last _CANDIDATES_CACHE_SIZE results are cached until
+        set_combinatorial_limits is called.
 
         Args:
             idx_start: Starting index in the dataframe
             max_results: Maximum number of results to return
+            target_probability: With max_results=1, stop at (and return) the first candidate
+                reaching this probability instead of searching for the best one
 
         Returns:
             List of WaveCandidate objects sorted by probability (highest first)
         """
-        candidates = []
+        key = ('impulse', idx_start, max_results, self.min_probability, target_probability)
+        cached = self._cached_candidates(key)
+        if cached is not None:
+            return cached
 
-        for wave_option in self.__waveoptions_impulse.options_sorted:
-            waves = self._find_impulsive_wave(idx_start, wave_option.values)
-
-            if waves:
-                # Basic rule check first
-                wave_pattern = WavePattern(waves, verbose=False)
+        candidates = []
 
-                if wave_pattern.check_rule(self.impulse_rule):
-                    # Calculate probability score
-                    prob_analysis = self.prob_scorer.score_impulse_pattern(waves, wave_pattern)
+        found = list(self._iter_wave_options(self._impulse_option_tree, IMPULSE_WAVES, idx_start,
+                                             self._impulse_invalidated))
+
+        # Basic rule check first (for all found waves at once, on their prices and indices as arrays), then the
+        # rules of the probability scoring, so only patterns with a valid score are scored one by one
+        waves_list = [waves for _, waves in found]
+        wave_arrays = MonoWaveArrays.from_patterns(waves_list) if found else None
+        rule_ok = WavePattern.check_rule_batch(waves_list, self.impulse_rule, wave_arrays)
+        if found:
+            rule_ok &= self.prob_scorer.impulse_rules_batch(wave_arrays)
+
+        for k in np.flatnonzero(rule_ok):
+            wave_option, waves = found[k]
+
+            # Calculate probability score (the WavePattern is only built for accepted candidates)
+            prob_analysis = self.prob_scorer.score_impulse_pattern(waves, min_probability=self.min_probability)
+
+            if prob_analysis['valid_pattern'] and prob_analysis['overall_probability'] >= self.min_probability:
+                candidate = WaveCandidate(
+                    pattern=WavePattern(waves, verbose=False),
+                    probability_analysis=prob_analysis,
+                    wave_type='impulse',
+                    wave_options=list(wave_option)
+                )
+                candidates.append(candidate)
 
-                    if prob_analysis['valid_pattern'] and prob_analysis['overall_probability'] >= self.min_probability:
-                        candidate = WaveCandidate(
-                            pattern=wave_pattern,
-                            probability_analysis=prob_analysis,
-                            wave_type='impulse',
-                            wave_options=wave_option.values
-                        )
-                        candidates.append(candidate)
+                if self.verbose:
+                    print(f"Found impulse: {wave_option}, prob={candidate.probability:.1f}%")
 
-                        if self.verbose:
-                            print(f"Found impulse: {wave_option.values}, prob={candidate.probability:.1f}%")
+                if max_results == 1 and target_probability is not None and candidate.probability >= target_probability:
+                    return self._cache_candidates(key, [candidate])
 
-        # Sort by probability (highest first) and return top N
-        candidates.sort(reverse=True)
-        return candidates[:max_results]
+        # Top N by probability (highest first), without sorting all candidates
+        return self._cache_candidates(key, heapq.nlargest(max_results, candidates, key=attrgetter('probability')))
 
-    def find_best_corrective_waves(self, idx_start: int, max_results: int = 10) -> List[WaveCandidate]:
+    def find_best_corrective_waves(self, idx_start: int, max_results: int = 10,
+                                target_probability: Optional[float] = None) -> List[WaveCandidate]:
         """
         Find the best corrective wave patterns starting from idx_start.
 
-        Returns patterns sorted by probability score.
+        Returns patterns sorted by probability score. The last _CANDIDATES_CACHE_SIZE results are cached until
+        set_combinatorial_limits is called.
 
         Args:
             idx_start: Starting index in the dataframe
             max_results: Maximum number of results to return
+            target_probability: With max_results=1, stop at (and return) the first candidate
+                reaching this probability instead of searching for the best one
 
         Returns:
             List of WaveCandidate objects sorted by probability (highest first)
         """
-        candidates = []
+        key = ('correction', idx_start, max_results, self.min_probability, target_probability)
+        cached = self._cached_candidates(key)
+        if cached is not None:
+            return cached
 
-        for wave_option in self.__waveoptions_correction.options_sorted:
-            waves = self._find_corrective_wave(idx_start, wave_option.values)
-
-            if waves:
-                wave_pattern = WavePattern(waves, verbose=False)
+        candidates = []
 
-                if wave_pattern.check_rule(self.correction_rule):
-                    # Calculate probability score
-                    prob_analysis = self.prob_scorer.score_corrective_pattern(waves, wave_pattern)
+        found = list(self._iter_wave_options(self._correction_option_tree, CORRECTIVE_WAVES, idx_start))
+        waves_list = [waves for _, waves in found]
+        wave_arrays = MonoWaveArrays.from_patterns(waves_list) if found else None
+        rule_ok = WavePattern.check_rule_batch(waves_list, self.correction_rule, wave_arrays)
+        if found:
+            rule_ok &= self.prob_scorer.corrective_rules_batch(wave_arrays)
+
+        for k in np.flatnonzero(rule_ok):
+            wave_option, waves = found[k]
+
+            # Calculate probability score (the WavePattern is only built for accepted candidates)
+            prob_analysis = self.prob_scorer.score_corrective_pattern(waves)
+
+            if prob_analysis['valid_pattern'] and prob_analysis['overall_probability'] >= self.min_probability:
+                candidate = WaveCandidate(
+                    pattern=WavePattern(waves, verbose=False),
+                    probability_analysis=prob_analysis,
+                    wave_type='correction',
+                    wave_options=wave_option + [None, None]  # same as WaveOptions.values of 3 waves
+                )
+                candidates.append(candidate)
 
-                    if prob_analysis['valid_pattern'] and prob_analysis['overall_probability'] >= self.min_probability:
-                        candidate = WaveCandidate(
-                            pattern=wave_pattern,
-                            probability_analysis=prob_analysis,
-                            wave_type='correction',
-                            wave_options=wave_option.values
-                        )
-                        candidates.append(candidate)
+                if self.verbose:
+                    print(f"Found correction: {wave_option}, prob={candidate.probability:.1f}%")
 
-                        if self.verbose:
-                            print(f"Found correction: {wave_option.values}, prob={candidate.probability:.1f}%")
+                if max_results == 1 and target_probability is not None and candidate.probability >= target_probability:
+                    return self._cache_candidates(key, [candidate])
 
-        candidates.sort(reverse=True)
-        return candidates[:max_results]
+        return self._cache_candidates(key, heapq.nlargest(max_results, candidates, key=attrgetter('probability')))
 
     def find_wave_with_targets(self, idx_start: int, wave_type: str = 'impulse',
                                current_price: Optional[float] = None) -> Dict:
@@ -205,7 +299,7 @@ class EnhancedWaveAnalyzer:
         if current_price is None:
             last_idx = best_candidate.pattern.idx_end
             if last_idx is not None and last_idx < len(self.df):
-                current_price = self.df.iloc[last_idx]['Close']
+                current_price = self.closes[last_idx]
 
         result = {
             'found': True,
@@ -267,36 +361,26 @@ class EnhancedWaveAnalyzer:
                 'message': f'No patterns found with probability >= {min_probability}%'
             }
 
-        # Group by probability ranges
+        # Group by probability ranges (bucket 0 is below 60%, bucket 4 is 90% and above)
+        probs = np.fromiter((c.probability for c in filtered), dtype=np.float64, count=len(filtered))
+        buckets = np.digitize(probs, [60, 70, 80, 90])
         ranges = {
-            '90-100%': [],
-            '80-89%': [],
-            '70-79%': [],
-            '60-69%': [],
-            '50-59%': []
+            '90-100%': 4,
+            '80-89%': 3,
+            '70-79%': 2,
+            '60-69%': 1,
+            '50-59%': 0
         }
 
-        for candidate in filtered:
-            prob = candidate.probability
-            if prob >= 90:
-                ranges['90-100%'].append(candidate)
-            elif prob >= 80:
-                ranges['80-89%'].append(candidate)
-            elif prob >= 70:
-                ranges['70-79%'].append(candidate)
-            elif prob >= 60:
-                ranges['60-69%'].append(candidate)
-            else:
-                ranges['50-59%'].append(candidate)
-
         # Prepare summary
         summary = {}
-        for range_name, candidates in ranges.items():
-            if candidates:
+        for range_name, bucket in ranges.items():
+            members = np.flatnonzero(buckets == bucket)
+            if len(members):
                 summary[range_name] = {
-                    'count': len(candidates),
-                    'wave_options': [c.wave_options for c in candidates],
-                    'avg_probability': sum(c.probability for c in candidates) / len(candidates)
+                    'count': len(members),
+                    'wave_options': [filtered[i].wave_options for i in members],
+                    'avg_probability': probs[members].mean()
                 }
 
         return {
@@ -309,7 +393,9 @@ class EnhancedWaveAnalyzer:
 
     def scan_entire_dataset(self, wave_type: str = 'impulse',
                            min_probability: float = 70.0,
-                           step_size: int = 10) -> List[Dict]:
+                           step_size: int = 10,
+                           n_jobs: int = 1,
+                           first_match: bool = False) -> List[Dict]:
         """
         Scan entire dataset for wave patterns.
 
@@ -317,37 +403,188 @@ class EnhancedWaveAnalyzer:
             wave_type: 'impulse' or 'correction'
             min_probability: Minimum probability threshold
             step_size: Step size for scanning (to reduce computation)
+            n_jobs: Number of worker processes to scan with (default 1: scan in this process)
+            first_match: Report the first pattern reaching min_probability at each index instead of the
+                most probable one (faster)
 
         Returns:
             List of found patterns with their locations
         """
         patterns_found = []
 
-        for idx in range(0, len(self.df) - 50, step_size):  # Need at least 50 bars
-            if self.verbose:
-                if idx % 100 == 0:
-                    print(f"Scanning index {idx}/{len(self.df)}...")
+        scan_indices = range(0, len(self.df) - 50, step_size)  # Need at least 50 bars
+        target_probability = min_probability if first_match else None
 
-            if wave_type == 'impulse':
-                candidates = self.find_best_impulse_waves(idx, max_results=1)
-            else:
-                candidates = self.find_best_corrective_waves(idx, max_results=1)
+        if n_jobs > 1:
+            # Start indices are independent, so they can be scanned in separate processes
+            # (the analyzer is sent to every worker once)
+            with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_scan_worker, initargs=(self,)) as executor:
+                best_candidates = list(executor.map(_scan_worker_best_candidate, scan_indices, repeat(wave_type),
+                                                    repeat(target_probability),
+                                                    chunksize=max(1, len(scan_indices) // (4 * n_jobs))))
+        else:
+            best_candidates = map(self._best_candidate, scan_indices, repeat(wave_type), repeat(target_probability))
 
-            if candidates and candidates[0].probability >= min_probability:
+        for idx, candidate in zip(scan_indices, best_candidates):
+            if candidate is not None and candidate.probability >= min_probability:
                 pattern_info = {
                     'start_idx': idx,
                     'start_date': self.dates[idx],
-                    'end_idx': candidates[0].pattern.idx_end,
-                    'end_date': self.dates[candidates[0].pattern.idx_end] if candidates[0].pattern.idx_end < len(self.dates) else None,
-                    'probability': candidates[0].probability,
+                    'end_idx': candidate.pattern.idx_end,
+                    'end_date': self.dates[candidate.pattern.idx_end] if candidate.pattern.idx_end < len(self.dates) else None,
+                    'probability': candidate.probability,
                     'wave_type': wave_type,
-                    'wave_options': candidates[0].wave_options,
-                    'candidate': candidates[0]
+                    'wave_options': candidate.wave_options,
+                    'candidate': candidate
                 }
                 patterns_found.append(pattern_info)
 
         return patterns_found
 
+    def _best_candidate(self, idx: int, wave_type: str,
+                        target_probability: Optional[float] = None) -> Optional[WaveCandidate]:
+        """
+        Returns the most probable candidate starting at idx (None if there is none), used by scan_entire_dataset.
+        """
+        if self.verbose:
+            if idx % 100 == 0:
+                print(f"Scanning index {idx}/{len(self.df)}...")
+
+        if wave_type == 'impulse':
+            candidates = self.find_best_impulse_waves(idx, max_results=1, target_probability=target_probability)
+        else:
+            candidates = self.find_best_corrective_waves(idx, max_results=1, target_probability=target_probability)
+
+        return candidates[0] if candidates else None
+
+    def _cached_candidates(self, key: Tuple) -> Optional[List[WaveCandidate]]:
+        """
+        Returns a copy of the cached candidates of key, or None if they are not (or no longer) cached.
+        """
+        candidates = self._candidates_cache.get(key)
+        if candidates is None:
+            return None
+        self._candidates_cache.move_to_end(key)
+        return list(candidates)
+
+    def _cache_candidates(self, key: Tuple, candidates: List[WaveCandidate]) -> List[WaveCandidate]:
+        """
+        Caches the candidates of key, keeping the last _CANDIDATES_CACHE_SIZE results, and returns a copy.
+        """
+        self._candidates_cache[key] = candidates
+        if len(self._candidates_cache) > self._CANDIDATES_CACHE_SIZE:
+            self._candidates_cache.popitem(last=False)
+        return list(candidates)
+
+    def _get_monowave(self, wave_cls, label: str, idx_start: int, skip: int):
+        """
+        Returns the MonoWave of type wave_cls (MonoWaveUp / MonoWaveDown) starting at idx_start with
+        the given skip and label. MonoWaves are not modified after construction, so the last
+        _MONOWAVE_CACHE_SIZE of them are cached.
+        """
+        key = (label, idx_start, skip)
+        wave = self._monowave_cache.get(key)
+        if wave is not None:
+            self._monowave_cache.move_to_end(key)
+            return wave
+
+        wave = wave_cls(lows=self.lows, highs=self.highs, dates=self.dates,
+                        idx_start=idx_start, skip=skip)
+        wave.label = label
+        self._monowave_cache[key] = wave
+        if len(self._monowave_cache) > self._MONOWAVE_CACHE_SIZE:
+            self._monowave_cache.popitem(last=False)
+        return wave
+
+    @staticmethod
+    def _build_option_matrix(up_to: int, n_waves: int) -> np.ndarray:
+        """
+        Returns the wave options of WaveOptionsGenerator5 (n_waves=5) or WaveOptionsGenerator3 (n_waves=3) as
+        an int8 matrix with one row per option, in the same order as their options_sorted.
+
+        A wave option skips 1 to up_to - 1 extrema for its first waves and 0 for the rest, e.g. [2, 1, 0, 0, 0].
+        """
+        n_skips = max(up_to - 1, 0)
+        blocks = [np.zeros((min(up_to, 1), n_waves), dtype=np.int8)]
+        for n_nonzero in range(1, n_waves + 1):
+            block = np.zeros((n_skips ** n_nonzero, n_waves), dtype=np.int8)
+            block[:, :n_nonzero] = np.indices((n_skips,) * n_nonzero, dtype=np.int8).reshape(n_nonzero, -1).T + 1
+            blocks.append(block)
+
+        options = np.concatenate(blocks)
+        return options[np.lexsort(options.T[::-1])]
+
+    @staticmethod
+    def _build_option_tree(wave_options: np.ndarray) -> Dict:
+        """
+        Builds a prefix tree {skip_wave1: {skip_wave2: ... {skip_waveN: wave_option}}} from sorted wave options
+        (rows of an option matrix, the leaves are the rows as lists). Iterating the tree depth first visits the
+        options in the same (sorted) order.
+        """
+        tree = {}
+        for values in wave_options.tolist():
+            node = tree
+            for skip in values[:-1]:
+                node = node.setdefault(skip, {})
+            node[values[-1]] = values
+        return tree
+
+    def _iter_wave_options(self, option_tree: Dict, wave_specs: Tuple, idx_start: int,
+                           invalidated=None, waves: List = None):
+        """
+        Depth first search over a wave option prefix tree.
+
+        Yields (wave_option, waves) for every wave option whose waves can all be found from idx_start, in
+        sorted wave option order. If a wave cannot be found (or invalidated(waves) is True for the waves so
+        far), all wave options sharing that prefix are skipped without building their waves.
+        """
+        if waves is None:
+            waves = []
+
+        wave_cls, label = wave_specs[len(waves)]
+
+        for skip, subtree in option_tree.items():
+            wave = self._get_monowave(wave_cls, label, idx_start, skip)
+            if wave.idx_end is None:
+                continue
+
+            waves.append(wave)
+            if invalidated is None or not invalidated(waves):
+                if isinstance(subtree, dict):
+                    yield from self._iter_wave_options(subtree, wave_specs, wave.idx_end, invalidated, waves)
+                else:
+                    yield subtree, list(waves)
+            waves.pop()
+
+    def _min_low(self, idx_from: int, idx_to: int) -> float:
+        """
+        Returns np.min(self.lows[idx_from:idx_to]) in constant time. Like np.min, raises a ValueError if
+        the range is empty.
+        """
+        idx_to = min(idx_to, len(self.lows))
+        if idx_to <= idx_from:
+            raise ValueError("zero-size array to reduction operation minimum which has no identity")
+
+        k = int(idx_to - idx_from).bit_length() - 1
+        level = self._low_table[k]
+        return min(level[idx_from], level[idx_to - 2 ** k])
+
+    def _impulse_invalidated(self, waves: List) -> bool:
+        """
+        Checks the lows between the waves found so far of an impulse, returns True if the impulse is invalid.
+        """
+        if len(waves) == 4:
+            wave2, wave4 = waves[1], waves[3]
+            # Check for invalidating lows between wave 2 and wave 4
+            return wave2.low > self._min_low(wave2.low_idx, wave4.low_idx)
+
+        if len(waves) == 5:
+            wave4, wave5 = waves[3], waves[4]
+            # Check for invalidating lows between wave 4 and wave 5
+            return wave5.high_idx > wave4.low_idx and wave4.low > self._min_low(wave4.low_idx, wave5.high_idx)
+
+        return False
+
     def _find_impulsive_wave(self, idx_start: int, wave_config: list) -> Optional[List]:
         """
         Internal method to find 5-wave impulsive pattern.
@@ -355,47 +592,37 @@ class EnhancedWaveAnalyzer:
         if wave_config is None:
             wave_config = [0, 0, 0, 0, 0]
 
-        wave1 = MonoWaveUp(lows=self.lows, highs=self.highs, dates=self.dates,
-                          idx_start=idx_start, skip=wave_config[0])
-        wave1.label = '1'
+        wave1 = self._get_monowave(MonoWaveUp, '1', idx_start, wave_config[0])
         wave1_end = wave1.idx_end
         if wave1_end is None:
             return False
 
-        wave2 = MonoWaveDown(lows=self.lows, highs=self.highs, dates=self.dates,
-                            idx_start=wave1_end, skip=wave_config[1])
-        wave2.label = '2'
+        wave2 = self._get_monowave(MonoWaveDown, '2', wave1_end, wave_config[1])
         wave2_end = wave2.idx_end
         if wave2_end is None:
             return False
 
-        wave3 = MonoWaveUp(lows=self.lows, highs=self.highs, dates=self.dates,
-                          idx_start=wave2_end, skip=wave_config[2])
-        wave3.label = '3'
+        wave3 = self._get_monowave(MonoWaveUp, '3', wave2_end, wave_config[2])
         wave3_end = wave3.idx_end
         if wave3_end is None:
             return False
 
-        wave4 = MonoWaveDown(lows=self.lows, highs=self.highs, dates=self.dates,
-                            idx_start=wave3_end, skip=wave_config[3])
-        wave4.label = '4'
+        wave4 = self._get_monowave(MonoWaveDown, '4', wave3_end, wave_config[3])
         wave4_end = wave4.idx_end
         if wave4_end is None:
             return False
 
         # Check for invalidating lows between wave 2 and wave 4
-        if wave2.low > np.min(self.lows[wave2.low_idx:wave4.low_idx]):
+        if self._impulse_invalidated([wave1, wave2, wave3, wave4]):
             return False
 
-        wave5 = MonoWaveUp(lows=self.lows, highs=self.highs, dates=self.dates,
-                          idx_start=wave4_end, skip=wave_config[4])
-        wave5.label = '5'
+        wave5 = self._get_monowave(MonoWaveUp, '5', wave4_end, wave_config[4])
         wave5_end = wave5.idx_end
         if wave5_end is None:
             return False
 
         # Check for invalidating lows between wave 4 and wave 5
-        if self.lows[wave4.low_idx:wave5.high_idx].any() and wave4.low > np.min(self.lows[wave4.low_idx:wave5.high_idx]):
+        if self._impulse_invalidated([wave1, wave2, wave3, wave4, wave5]):
             return False
 
         return [wave1, wave2, wave3, wave4, wave5]
@@ -407,23 +634,17 @@ class EnhancedWaveAnalyzer:
         if wave_config is None:
             wave_config = [0, 0, 0]
 
-        waveA = MonoWaveDown(lows=self.lows, highs=self.highs, dates=self.dates,
-                            idx_start=idx_start, skip=wave_config[0])
-        waveA.label = 'A'
+        waveA = self._get_monowave(MonoWaveDown, 'A', idx_start, wave_config[0])
         waveA_end = waveA.idx_end
         if waveA_end is None:
             return False
 
-        waveB = MonoWaveUp(lows=self.lows, highs=self.highs, dates=self.dates,
-                          idx_start=waveA_end, skip=wave_config[1])
-        waveB.label = 'B'
+        waveB = self._get_monowave(MonoWaveUp, 'B', waveA_end, wave_config[1])
         waveB_end = waveB.idx_end
         if waveB_end is None:
             return False
 
-        waveC = MonoWaveDown(lows=self.lows, highs=self.highs, dates=self.dates,
-                            idx_start=waveB_end, skip=wave_config[2])
-        waveC.label = 'C'
+        waveC = self._get_monowave(MonoWaveDown, 'C', waveB_end, wave_config[2])
         waveC_end = waveC.idx_end
         if waveC_end is None:
             return False
@@ -432,7 +653,7 @@ class EnhancedWaveAnalyzer:
 
     def get_current_price(self) -> float:
         """Get the most recent close price."""
-        return self.df.iloc[-1]['Close']
+        return self.closes[-1]
 
     def create_analysis_report(self, idx_start: int, wave_type: str = 'impulse') -> str:
         """
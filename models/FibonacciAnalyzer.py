@@ -6,8 +6,21 @@ to validate wave patterns and calculate price targets.
 """
 
 import numpy as np
+from collections import OrderedDict
+from operator import attrgetter, itemgetter
 from typing import Dict, List, Tuple, Optional
 from models.MonoWave import MonoWave, MonoWaveUp, MonoWaveDown
+from models.functions import match_ratios
+
+
+def _ratios(*ratios: float) -> np.ndarray:
+    """Read-only float64 array of expected Fibonacci ratios"""
+    array = np.array(ratios, dtype=np.float64)
+    array.setflags(write=False)
+    return array
+
+
+_wave_length = attrgetter('length')
 
 
 class FibonacciAnalyzer:
@@ -26,9 +39,33 @@ class FibonacciAnalyzer:
     # Tolerance for Fibonacci ratio matching (5%)
     TOLERANCE = 0.05
 
+    # Expected ratios of the wave relationships (read-only, shared by all calls)
+    _WAVE2_EXPECTED = _ratios(0.382, 0.500, 0.618, 0.786, 0.854)     # Wave 2 retracement of Wave 1
+    _WAVE3_EXPECTED = _ratios(1.000, 1.618, 2.000, 2.618, 3.236)     # Wave 3 extension of Wave 1
+    _WAVE3_VS_12_EXPECTED = _ratios(1.618, 2.000, 2.618)             # Wave 3 vs Wave 1-2 distance
+    _WAVE4_EXPECTED = _ratios(0.146, 0.236, 0.382, 0.500)            # Wave 4 retracement of Wave 3
+    _WAVE5_VS_1_EXPECTED = _ratios(0.618, 1.000, 1.618)              # Wave 5 vs Wave 1
+    _WAVE5_VS_13_EXPECTED = _ratios(0.382, 0.618, 1.000)             # Wave 5 vs Wave 1-3 distance
+    _WAVE5_VS_4_EXPECTED = _ratios(1.236, 1.382, 1.618, 2.000)       # Wave 5 inverse retracement of Wave 4
+    _WAVEB_EXPECTED = _ratios(0.382, 0.500, 0.618, 0.786, 0.854)     # Wave B vs Wave A
+    _WAVEC_EXPECTED = _ratios(0.618, 1.000, 1.236, 1.618, 2.618)     # Wave C vs Wave A
+
+    # The expected ratio arrays above by tuple of their ratios, so lists of the same ratios passed to
+    # _find_matching_ratios reuse them (fixed table, other lists are converted on each call)
+    _EXPECTED_ARRAYS = {tuple(expected.tolist()): expected for expected in (
+        _WAVE2_EXPECTED, _WAVE3_EXPECTED, _WAVE3_VS_12_EXPECTED, _WAVE4_EXPECTED, _WAVE5_VS_1_EXPECTED,
+        _WAVE5_VS_13_EXPECTED, _WAVE5_VS_4_EXPECTED, _WAVEB_EXPECTED, _WAVEC_EXPECTED)}
+
+    # Maximum number of _ratio_quality results kept per instance
+    _QUALITY_CACHE_SIZE = 4096
+
     def __init__(self):
         self.wave_relationships = {}
 
+        # _ratio_quality results by (expected ratios, ratio type, ratio), least recently used first; candidate
+        # patterns share waves, so the same ratios come up again and again
+        self._quality_cache: OrderedDict = OrderedDict()
+
     def analyze_wave_2_retracement(self, wave1: MonoWave, wave2: MonoWave) -> Dict:
         """
         Analyze Wave 2 retracement of Wave 1.
@@ -38,18 +75,18 @@ class FibonacciAnalyzer:
         Returns:
             Dict with ratio, closest_fib, deviation, and quality score
         """
-        wave1_length = wave1.length
-        wave2_length = wave2.length
+        return self._wave_2_retracement(wave1.length, wave2.length)
 
+    def _wave_2_retracement(self, wave1_length: float, wave2_length: float) -> Dict:
+        """
+        Same as analyze_wave_2_retracement on the wave lengths.
+        """
         if wave1_length == 0:
             return {'ratio': 0, 'matches': [], 'quality': 0}
 
         retracement_ratio = wave2_length / wave1_length
 
-        # Expected ranges for Wave 2
-        expected_ratios = [0.382, 0.500, 0.618, 0.786, 0.854]
-
-        matches = self._find_matching_ratios(retracement_ratio, expected_ratios)
+        matches = self._find_matching_ratios(retracement_ratio, self._WAVE2_EXPECTED)
         quality = self._calculate_quality_score(matches)
 
         return {
@@ -69,25 +106,25 @@ class FibonacciAnalyzer:
         Returns:
             Dict with ratio, matches, and quality score
         """
-        wave1_length = wave1.length
-        wave3_length = wave3.length
+        wave1_2_distance = wave1.high - wave2.low if isinstance(wave1, MonoWaveUp) else wave2.high - wave1.low
+        return self._wave_3_extension(wave1.length, wave3.length, wave1_2_distance)
 
+    def _wave_3_extension(self, wave1_length: float, wave3_length: float, wave1_2_distance: float) -> Dict:
+        """
+        Same as analyze_wave_3_extension on the wave lengths and the Wave 1-2 distance.
+        """
         if wave1_length == 0:
             return {'ratio': 0, 'matches': [], 'quality': 0}
 
         extension_ratio = wave3_length / wave1_length
 
-        # Expected ratios for Wave 3
-        expected_ratios = [1.000, 1.618, 2.000, 2.618, 3.236]
-
-        matches = self._find_matching_ratios(extension_ratio, expected_ratios)
+        matches = self._find_matching_ratios(extension_ratio, self._WAVE3_EXPECTED)
         quality = self._calculate_quality_score(matches)
 
         # Also check Wave 3 vs Wave 1-2 distance
-        wave1_2_distance = wave1.high - wave2.low if isinstance(wave1, MonoWaveUp) else wave2.high - wave1.low
         wave3_vs_12 = wave3_length / wave1_2_distance if wave1_2_distance > 0 else 0
 
-        matches_vs_12 = self._find_matching_ratios(wave3_vs_12, [1.618, 2.000, 2.618])
+        matches_vs_12 = self._find_matching_ratios(wave3_vs_12, self._WAVE3_VS_12_EXPECTED)
 
         return {
             'ratio': round(extension_ratio, 4),
@@ -108,18 +145,18 @@ class FibonacciAnalyzer:
         Returns:
             Dict with ratio, matches, and quality score
         """
-        wave3_length = wave3.length
-        wave4_length = wave4.length
+        return self._wave_4_retracement(wave3.length, wave4.length)
 
+    def _wave_4_retracement(self, wave3_length: float, wave4_length: float) -> Dict:
+        """
+        Same as analyze_wave_4_retracement on the wave lengths.
+        """
         if wave3_length == 0:
             return {'ratio': 0, 'matches': [], 'quality': 0}
 
         retracement_ratio = wave4_length / wave3_length
 
-        # Expected ratios for Wave 4
-        expected_ratios = [0.146, 0.236, 0.382, 0.500]
-
-        matches = self._find_matching_ratios(retracement_ratio, expected_ratios)
+        matches = self._find_matching_ratios(retracement_ratio, self._WAVE4_EXPECTED)
         quality = self._calculate_quality_score(matches)
 
         return {
@@ -145,53 +182,59 @@ class FibonacciAnalyzer:
         Returns:
             Dict with multiple ratios and matches
         """
-        wave1_length = wave1.length
-        wave3_length = wave3.length
-        wave4_length = wave4.length
-        wave5_length = wave5.length
+        wave1_3_distance = wave3.high - wave1.low if isinstance(wave1, MonoWaveUp) else wave1.high - wave3.low
+        return self._wave_5_projection(wave1.length, wave4.length, wave5.length, wave1_3_distance)
 
+    def _wave_5_projection(self, wave1_length: float, wave4_length: float, wave5_length: float,
+                           wave1_3_distance: float) -> Dict:
+        """
+        Same as analyze_wave_5_projection on the wave lengths and the Wave 1-3 distance.
+        """
         results = {}
+        total_quality = 0
+        n_methods = 0
 
         # Method 1: Wave 5 vs Wave 1
         if wave1_length > 0:
             wave5_vs_1 = wave5_length / wave1_length
-            matches_1 = self._find_matching_ratios(wave5_vs_1, [0.618, 1.000, 1.618])
+            matches_1 = self._find_matching_ratios(wave5_vs_1, self._WAVE5_VS_1_EXPECTED)
+            quality_1 = self._calculate_quality_score(matches_1)
             results['wave5_vs_wave1'] = {
                 'ratio': round(wave5_vs_1, 4),
                 'matches': matches_1,
-                'quality': self._calculate_quality_score(matches_1)
+                'quality': quality_1
             }
+            total_quality += quality_1
+            n_methods += 1
 
         # Method 2: Wave 5 vs Wave 1-3 distance
-        if isinstance(wave1, MonoWaveUp):
-            wave1_3_distance = wave3.high - wave1.low
-        else:
-            wave1_3_distance = wave1.high - wave3.low
-
         if wave1_3_distance > 0:
             wave5_vs_13 = wave5_length / wave1_3_distance
-            matches_13 = self._find_matching_ratios(wave5_vs_13, [0.382, 0.618, 1.000])
+            matches_13 = self._find_matching_ratios(wave5_vs_13, self._WAVE5_VS_13_EXPECTED)
+            quality_13 = self._calculate_quality_score(matches_13)
             results['wave5_vs_wave13'] = {
                 'ratio': round(wave5_vs_13, 4),
                 'matches': matches_13,
-                'quality': self._calculate_quality_score(matches_13)
+                'quality': quality_13
             }
+            total_quality += quality_13
+            n_methods += 1
 
         # Method 3: Wave 5 as inverse retracement of Wave 4
         if wave4_length > 0:
             wave5_vs_4 = wave5_length / wave4_length
-            matches_4 = self._find_matching_ratios(wave5_vs_4, [1.236, 1.382, 1.618, 2.000])
+            matches_4 = self._find_matching_ratios(wave5_vs_4, self._WAVE5_VS_4_EXPECTED)
+            quality_4 = self._calculate_quality_score(matches_4)
             results['wave5_inverse_wave4'] = {
                 'ratio': round(wave5_vs_4, 4),
                 'matches': matches_4,
-                'quality': self._calculate_quality_score(matches_4)
+                'quality': quality_4
             }
+            total_quality += quality_4
+            n_methods += 1
 
         # Overall quality
-        total_quality = sum(r.get('quality', 0) for r in results.values())
-        avg_quality = total_quality / len(results) if results else 0
-
-        results['overall_quality'] = avg_quality
+        results['overall_quality'] = total_quality / n_methods if n_methods else 0
 
         return results
 
@@ -215,30 +258,29 @@ class FibonacciAnalyzer:
         # Wave B vs Wave A
         if waveA_length > 0:
             waveB_vs_A = waveB_length / waveA_length
-            matches_B = self._find_matching_ratios(waveB_vs_A, [0.382, 0.500, 0.618, 0.786, 0.854])
+            matches_B = self._find_matching_ratios(waveB_vs_A, self._WAVEB_EXPECTED)
+            quality_B = self._calculate_quality_score(matches_B)
             results['waveB_vs_waveA'] = {
                 'ratio': round(waveB_vs_A, 4),
                 'matches': matches_B,
-                'quality': self._calculate_quality_score(matches_B)
+                'quality': quality_B
             }
 
         # Wave C vs Wave A
         if waveA_length > 0:
             waveC_vs_A = waveC_length / waveA_length
-            matches_C = self._find_matching_ratios(waveC_vs_A, [0.618, 1.000, 1.236, 1.618, 2.618])
+            matches_C = self._find_matching_ratios(waveC_vs_A, self._WAVEC_EXPECTED)
+            quality_C = self._calculate_quality_score(matches_C)
             results['waveC_vs_waveA'] = {
                 'ratio': round(waveC_vs_A, 4),
                 'matches': matches_C,
-                'quality': self._calculate_quality_score(matches_C),
+                'quality': quality_C,
                 'ideal_range': (1.000, 1.618),
                 'in_ideal_range': 1.000 <= waveC_vs_A <= 1.618
             }
 
-        # Overall quality
-        total_quality = sum(r.get('quality', 0) for r in results.values())
-        avg_quality = total_quality / len(results) if results else 0
-
-        results['overall_quality'] = avg_quality
+        # Overall quality (Wave B and Wave C are either both present or both absent)
+        results['overall_quality'] = (quality_B + quality_C) / 2 if waveA_length > 0 else 0
 
         return results
 
@@ -247,25 +289,33 @@ class FibonacciAnalyzer:
         """
         Find which expected Fibonacci ratios the actual ratio matches.
 
+        expected_ratios can be a list or a float64 array (lists of the class ratios reuse their arrays).
+
         Returns:
             List of dicts with matched ratio, deviation, and score
         """
-        matches = []
+        if not isinstance(expected_ratios, np.ndarray):
+            key = tuple(expected_ratios)
+            expected = self._EXPECTED_ARRAYS.get(key)
+            expected_ratios = expected if expected is not None else np.asarray(key, dtype=np.float64)
+
+        # Compiled comparison with all expected ratios, dicts are only built for the matching ones
+        idx, deviations, relative_deviations, scores = match_ratios(actual_ratio, expected_ratios, self.TOLERANCE)
 
-        for expected in expected_ratios:
-            deviation = abs(actual_ratio - expected)
-            relative_deviation = deviation / expected if expected > 0 else float('inf')
+        # Same number type as computing with actual_ratio directly (NumPy floats stay NumPy floats)
+        number = np.float64 if isinstance(actual_ratio, np.floating) else float
+        matches = [{
+            'fibonacci_ratio': float(expected_ratios[i]),
+            'deviation': round(number(deviations[k]), 4),
+            'relative_deviation': round(number(relative_deviations[k]), 4),
+            'score': round(number(scores[k]), 4)
+        } for k, i in enumerate(idx)]
 
-            if relative_deviation <= self.TOLERANCE:
-                score = 1.0 - (relative_deviation / self.TOLERANCE)
-                matches.append({
-                    'fibonacci_ratio': expected,
-                    'deviation': round(deviation, 4),
-                    'relative_deviation': round(relative_deviation, 4),
-                    'score': round(score, 4)
-                })
+        # Best match first (mostly there is at most one match, which needs no sorting)
+        if len(matches) > 1:
+            matches.sort(key=itemgetter('score'), reverse=True)
 
-        return sorted(matches, key=lambda x: x['score'], reverse=True)
+        return matches
 
     def _calculate_quality_score(self, matches: List[Dict]) -> float:
         """
@@ -285,6 +335,32 @@ class FibonacciAnalyzer:
 
         return min(1.0, best_score + bonus)
 
+    def _ratio_quality(self, actual_ratio: float, expected_ratios: np.ndarray) -> float:
+        """
+        Same as _calculate_quality_score(_find_matching_ratios(actual_ratio, expected_ratios)), without
+        building the match dicts. The last _QUALITY_CACHE_SIZE results are cached.
+        """
+        # The type is part of the key, as NumPy and Python floats of the same value give differently typed results
+        key = (expected_ratios.tobytes(), type(actual_ratio), actual_ratio)
+        quality = self._quality_cache.get(key)
+        if quality is not None:
+            self._quality_cache.move_to_end(key)
+            return quality
+
+        _, _, _, scores = match_ratios(actual_ratio, expected_ratios, self.TOLERANCE)
+        if not len(scores):
+            quality = 0.0
+        else:
+            number = np.float64 if isinstance(actual_ratio, np.floating) else float
+            best_score = max(round(number(score), 4) for score in scores)
+            quality = min(1.0, best_score + min(0.2, len(scores) * 0.05))
+
+        if actual_ratio == actual_ratio:  # NaN keys would never be found again
+            self._quality_cache[key] = quality
+            if len(self._quality_cache) > self._QUALITY_CACHE_SIZE:
+                self._quality_cache.popitem(last=False)
+        return quality
+
     def calculate_fibonacci_levels(self, start_price: float, end_price: float,
                                    level_type: str = 'retracement') -> Dict[str, float]:
         """
@@ -327,11 +403,18 @@ class FibonacciAnalyzer:
 
         wave1, wave2, wave3, wave4, wave5 = waves
 
+        # Wave lengths and direction once for all four analyses
+        length1, length2, length3, length4, length5 = map(_wave_length, waves)
+        if isinstance(wave1, MonoWaveUp):
+            wave1_2_distance, wave1_3_distance = wave1.high - wave2.low, wave3.high - wave1.low
+        else:
+            wave1_2_distance, wave1_3_distance = wave2.high - wave1.low, wave1.high - wave3.low
+
         analysis = {
-            'wave2_retracement': self.analyze_wave_2_retracement(wave1, wave2),
-            'wave3_extension': self.analyze_wave_3_extension(wave1, wave2, wave3),
-            'wave4_retracement': self.analyze_wave_4_retracement(wave3, wave4),
-            'wave5_projection': self.analyze_wave_5_projection(wave1, wave3, wave4, wave5)
+            'wave2_retracement': self._wave_2_retracement(length1, length2),
+            'wave3_extension': self._wave_3_extension(length1, length3, wave1_2_distance),
+            'wave4_retracement': self._wave_4_retracement(length3, length4),
+            'wave5_projection': self._wave_5_projection(length1, length4, length5, wave1_3_distance)
         }
 
         # Calculate overall Fibonacci quality score (0-100)
@@ -347,6 +430,44 @@ class FibonacciAnalyzer:
 
         return analysis
 
+    def score_impulse_wave_pattern(self, waves: List[MonoWave]) -> Tuple[float, int]:
+        """
+        Only the overall Fibonacci score of a 5-wave impulse pattern, e.g. to rank many candidates.
+
+        Args:
+            waves: List of 5 MonoWaves [wave1, wave2, wave3, wave4, wave5]
+
+        Returns:
+            overall_fibonacci_score, fibonacci_confirmations (as in analyze_impulse_wave_pattern)
+        """
+        if len(waves) != 5:
+            raise ValueError("Impulse pattern requires exactly 5 waves")
+
+        wave1, wave2, wave3, wave4, wave5 = waves
+        length1, length2, length3, length4, length5 = map(_wave_length, waves)
+        if isinstance(wave1, MonoWaveUp):
+            wave1_3_distance = wave3.high - wave1.low
+        else:
+            wave1_3_distance = wave1.high - wave3.low
+
+        quality2 = self._ratio_quality(length2 / length1, self._WAVE2_EXPECTED) if length1 != 0 else 0
+        quality3 = self._ratio_quality(length3 / length1, self._WAVE3_EXPECTED) if length1 != 0 else 0
+        quality4 = self._ratio_quality(length4 / length3, self._WAVE4_EXPECTED) if length3 != 0 else 0
+
+        # Wave 5: average over the methods that apply
+        qualities5 = []
+        if length1 > 0:
+            qualities5.append(self._ratio_quality(length5 / length1, self._WAVE5_VS_1_EXPECTED))
+        if wave1_3_distance > 0:
+            qualities5.append(self._ratio_quality(length5 / wave1_3_distance, self._WAVE5_VS_13_EXPECTED))
+        if length4 > 0:
+            qualities5.append(self._ratio_quality(length5 / length4, self._WAVE5_VS_4_EXPECTED))
+        quality5 = sum(qualities5) / len(qualities5) if qualities5 else 0
+
+        scores = [quality2 * 100, quality3 * 100, quality4 * 100, quality5 * 100]
+
+        return round(sum(scores) / len(scores), 2), sum(1 for s in scores if s >= 70)
+
     def analyze_corrective_pattern(self, waves: List[MonoWave]) -> Dict:
         """
         Comprehensive Fibonacci analysis of a 3-wave corrective pattern.
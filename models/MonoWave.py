@@ -1,6 +1,6 @@
 from __future__ import annotations
 import numpy as np
-from models.functions import hi, lo, next_hi, next_lo
+from models.functions import find_end_up, find_end_down
 
 class MonoWave:
     def __init__(self,
@@ -84,6 +84,7 @@ class MonoWaveUp(MonoWave):
     """
     Describes a upwards movement, which can have [skip_n] smaller downtrends
     """
+    direction = 1
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -102,24 +103,10 @@ class MonoWaveUp(MonoWave):
         :param idx_start:
         :return:
         """
-        high, high_idx = hi(self.lows_arr, self.highs_arr, self.idx_start)
-        low_at_start = self.lows_arr[self.idx_start]
-
-        if high is None:
+        high, high_idx = find_end_up(self.lows_arr, self.highs_arr, self.idx_start, self.skip_n)
+        if high_idx < 0:
             return None, None
 
-        for _ in range(self.skip_n):
-
-            act_high, act_high_idx = next_hi(self.lows_arr, self.highs_arr, high_idx, high)
-            if act_high is None:
-                return None, None
-
-            if act_high > high:
-                high = act_high
-                high_idx = act_high_idx
-                if np.min(self.lows_arr[self.idx_start:act_high_idx] < low_at_start):
-                    return None, None
-
         return high, high_idx
 
     @property
@@ -132,6 +119,8 @@ class MonoWaveUp(MonoWave):
 
 
 class MonoWaveDown(MonoWave):
+    direction = -1
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -162,26 +151,41 @@ class MonoWaveDown(MonoWave):
         :return:
         """
 
-        low, low_idx = lo(self.lows_arr, self.highs_arr, self.idx_start)
-        high_at_start = self.highs_arr[self.idx_start]
-        if low is None:
+        low, low_idx = find_end_down(self.lows_arr, self.highs_arr, self.idx_start, self.skip_n)
+        if low_idx < 0:
             return None, None
 
-        for _ in range(self.skip_n):
-            act_low, act_low_idx = next_lo(self.lows_arr, self.highs_arr, low_idx, low)
-            if act_low is None:
-                return None, None
-
-            if act_low < low:
-                low = act_low
-                low_idx = act_low_idx
-                if np.max(self.highs_arr[self.idx_start:act_low_idx]) > high_at_start:
-                    return None, None
-
-            # TODO what to do if no more minima can be found?
-            # if act_low > low:
-            #    return None, None
-        #if low > np.min(self.lows_arr[low_idx:]):
-        #    return None, None
-        #else:
         return low, low_idx
+
+
+class MonoWaveArrays:
+    """
+    The MonoWaves at one position (e.g. wave1) of many wave patterns, stored as arrays. Offers the attributes
+    the WaveRules use (low, high, idx_start, idx_end, length, duration), so a rule evaluates all patterns at once.
+    direction is 1 for MonoWaveUp and -1 for MonoWaveDown.
+    """
+
+    def __init__(self, waves: list):
+        self.direction = np.array([wave.direction for wave in waves], dtype=np.int8)
+        self.low = np.array([wave.low for wave in waves], dtype=np.float64)
+        self.high = np.array([wave.high for wave in waves], dtype=np.float64)
+        self.low_idx = np.array([wave.low_idx for wave in waves], dtype=np.int64)
+        self.high_idx = np.array([wave.high_idx for wave in waves], dtype=np.int64)
+        self.idx_start = np.array([wave.idx_start for wave in waves], dtype=np.int64)
+        self.idx_end = np.array([wave.idx_end for wave in waves], dtype=np.int64)
+
+    @classmethod
+    def from_patterns(cls, waves_list: list) -> list:
+        """
+        Splits wave patterns (lists of consecutive MonoWaves, all of the same length) into one MonoWaveArrays
+        per wave position.
+        """
+        return [cls([waves[i] for waves in waves_list]) for i in range(len(waves_list[0]))]
+
+    @property
+    def length(self) -> np.array:
+        return np.abs(self.high - self.low)
+
+    @property
+    def duration(self) -> np.array:
+        return self.idx_end - self.idx_start
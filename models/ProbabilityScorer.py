@@ -11,10 +11,11 @@ This module scores wave patterns based on:
 
 import numpy as np
 from typing import Dict, List, Optional
-from models.MonoWave import MonoWave, MonoWaveUp, MonoWaveDown
+from models.MonoWave import MonoWave, MonoWaveUp, MonoWaveDown, MonoWaveArrays
 from models.WavePattern import WavePattern
 from models.WaveRules import WaveRule, Impulse, Correction
 from models.FibonacciAnalyzer import FibonacciAnalyzer
+from models.functions import impulse_guideline_scores, corrective_guideline_scores
 
 
 class ProbabilityScorer:
@@ -23,6 +24,30 @@ class ProbabilityScorer:
     multiple factors including rules, guidelines, and Fibonacci relationships.
     """
 
+    # Guideline details by guideline score
+    _WAVE3_LONGEST_DETAILS = {100: "Wave 3 is longest (ideal)",
+                              70: "Wave 3 is near longest",
+                              40: "Wave 3 is not the longest"}
+    _WAVE3_EXTENSION_DETAILS = {100: "Wave 3 extension ideal: {:.2f}x",
+                                70: "Wave 3 extension acceptable: {:.2f}x",
+                                40: "Wave 3 extension weak: {:.2f}x"}
+    _ALTERNATION_DETAILS = {100: "Strong alternation between Wave 2 and 4",
+                            70: "Moderate alternation between Wave 2 and 4",
+                            40: "Weak alternation between Wave 2 and 4"}
+    _EQUALITY_DETAILS = {100: "Wave 1 and 5 equality: {:.2f}",
+                         70: "Wave 1 and 5 near equality: {:.2f}",
+                         40: "Wave 1 and 5 not equal: {:.2f}",
+                         50: "Wave 3 not extended (equality N/A)"}
+    _WAVEC_DETAILS = {100: "Wave C vs A ideal: {:.2f}",
+                      70: "Wave C vs A acceptable: {:.2f}",
+                      40: "Wave C vs A weak: {:.2f}"}
+    _WAVEB_DETAILS = {100: "Wave B retracement ideal: {:.2f}",
+                      70: "Wave B retracement acceptable: {:.2f}",
+                      40: "Wave B retracement unusual: {:.2f}"}
+    _TIME_DETAILS = {100: "Time proportionality good",
+                     70: "Time proportionality acceptable",
+                     40: "Time proportionality poor"}
+
     def __init__(self):
         self.fib_analyzer = FibonacciAnalyzer()
 
@@ -35,13 +60,15 @@ class ProbabilityScorer:
         }
 
     def score_impulse_pattern(self, waves: List[MonoWave],
-                              wave_pattern: WavePattern = None) -> Dict:
+                              wave_pattern: WavePattern = None, min_probability: float = 0.0) -> Dict:
         """
         Calculate comprehensive probability score for a 5-wave impulse pattern.
 
         Args:
             waves: List of 5 MonoWaves
             wave_pattern: Optional WavePattern object
+            min_probability: Patterns below this probability only get their overall probability and scores
+                (without Fibonacci details, category and summary), marked with 'below_min_probability'
 
         Returns:
             Dict with detailed scoring breakdown and overall probability
@@ -66,29 +93,44 @@ class ProbabilityScorer:
                 'rule_violations': rules_score['violations']
             }
 
+        # 3. Guidelines Adherence (20% weight) and 4. Structure Quality (10% weight) first, as they are cheap
+        guidelines_score = self._score_impulse_guidelines(waves)
+        structure_score = self._score_wave_structure(waves)
+
         # 2. Fibonacci Ratios (30% weight)
+        # If the pattern could stay below min_probability, its Fibonacci score alone decides if it reaches
+        # min_probability, before the full Fibonacci analysis
+        if min_probability > 0 and round(self._overall_probability(
+                rules_score['score'], 0, guidelines_score['score'], structure_score['score']), 2) < min_probability:
+            fib_score, fib_confirmations = self.fib_analyzer.score_impulse_wave_pattern(waves)
+            overall_prob = self._overall_probability(rules_score['score'], fib_score,
+                                                     guidelines_score['score'], structure_score['score'])
+            if round(overall_prob, 2) < min_probability:
+                scores['fibonacci_ratios'] = {
+                    'score': fib_score,
+                    'confirmations': fib_confirmations
+                }
+                scores['guidelines'] = guidelines_score
+                scores['structure_quality'] = structure_score
+                return {
+                    'valid_pattern': True,
+                    'overall_probability': round(overall_prob, 2),
+                    'below_min_probability': True,
+                    'scores': scores
+                }
+
         fib_analysis = self.fib_analyzer.analyze_impulse_wave_pattern(waves)
         scores['fibonacci_ratios'] = {
             'score': fib_analysis['overall_fibonacci_score'],
             'confirmations': fib_analysis['fibonacci_confirmations'],
             'details': fib_analysis
         }
-
-        # 3. Guidelines Adherence (20% weight)
-        guidelines_score = self._score_impulse_guidelines(waves)
         scores['guidelines'] = guidelines_score
-
-        # 4. Structure Quality (10% weight)
-        structure_score = self._score_wave_structure(waves)
         scores['structure_quality'] = structure_score
 
         # Calculate overall probability
-        overall_prob = (
-            (rules_score['score'] / 100) * self.weights['rules_compliance'] +
-            (scores['fibonacci_ratios']['score'] / 100) * self.weights['fibonacci_ratios'] +
-            (guidelines_score['score'] / 100) * self.weights['guidelines'] +
-            (structure_score['score'] / 100) * self.weights['structure_quality']
-        ) * 100
+        overall_prob = self._overall_probability(rules_score['score'], scores['fibonacci_ratios']['score'],
+                                                 guidelines_score['score'], structure_score['score'])
 
         # Categorize probability
         category = self._categorize_probability(overall_prob)
@@ -149,12 +191,8 @@ class ProbabilityScorer:
         scores['structure_quality'] = structure_score
 
         # Calculate overall probability
-        overall_prob = (
-            (rules_score['score'] / 100) * self.weights['rules_compliance'] +
-            (scores['fibonacci_ratios']['score'] / 100) * self.weights['fibonacci_ratios'] +
-            (guidelines_score['score'] / 100) * self.weights['guidelines'] +
-            (structure_score['score'] / 100) * self.weights['structure_quality']
-        ) * 100
+        overall_prob = self._overall_probability(rules_score['score'], scores['fibonacci_ratios']['score'],
+                                                 guidelines_score['score'], structure_score['score'])
 
         category = self._categorize_probability(overall_prob)
 
@@ -166,6 +204,66 @@ class ProbabilityScorer:
             'summary': self._generate_summary(overall_prob, scores)
         }
 
+    def _overall_probability(self, rules_score: float, fib_score: float, guidelines_score: float,
+                             structure_score: float) -> float:
+        """
+        Weighted overall probability (0-100) from the four scores (each 0-100).
+        """
+        return (
+            (rules_score / 100) * self.weights['rules_compliance'] +
+            (fib_score / 100) * self.weights['fibonacci_ratios'] +
+            (guidelines_score / 100) * self.weights['guidelines'] +
+            (structure_score / 100) * self.weights['structure_quality']
+        ) * 100
+
+    def impulse_rules_batch(self, waves: List[MonoWaveArrays]) -> np.ndarray:
+        """
+        Checks the impulse rules of _score_impulse_rules for many 5-wave patterns at once.
+
+        Args:
+            waves: List of 5 MonoWaveArrays (see MonoWaveArrays.from_patterns)
+
+        Returns:
+            Boolean array, True where the pattern has no rule violations (rules score 100)
+        """
+        wave1, wave2, wave3, wave4, wave5 = waves
+        up = wave1.direction > 0
+
+        # Rule 1: Wave 2 cannot retrace more than 100% of Wave 1
+        valid = np.where(up, wave2.low > wave1.low, wave2.high < wave1.high)
+
+        # Rule 2: Wave 3 cannot be the shortest
+        valid &= ~((wave3.length < wave1.length) & (wave3.length < wave5.length))
+
+        # Rule 3: Wave 4 cannot overlap Wave 1
+        valid &= np.where(up, wave4.low > wave1.high, wave4.high < wave1.low)
+
+        return valid
+
+    def corrective_rules_batch(self, waves: List[MonoWaveArrays]) -> np.ndarray:
+        """
+        Checks the corrective rules of _score_corrective_rules for many 3-wave patterns at once.
+
+        Args:
+            waves: List of 3 MonoWaveArrays (see MonoWaveArrays.from_patterns)
+
+        Returns:
+            Boolean array, True where the pattern has no rule violations (rules score 100)
+        """
+        waveA, waveB, waveC = waves
+        lengthA = waveA.length
+        has_length = lengthA > 0
+        safe_lengthA = np.where(has_length, lengthA, 1.0)
+
+        # Rule 1: Wave B should not significantly exceed Wave A starting point
+        waveB_retracement = np.where(has_length, waveB.length / safe_lengthA, 0)
+        valid = ~((waveA.direction < 0) & (waveB_retracement > 1.40))
+
+        # Rule 2: Wave C should move beyond or near Wave A endpoint
+        valid &= ~(has_length & (waveC.length / safe_lengthA < 0.50))
+
+        return valid
+
     def _score_impulse_rules(self, waves: List[MonoWave],
                             wave_pattern: WavePattern = None) -> Dict:
         """
@@ -175,10 +273,11 @@ class ProbabilityScorer:
             Dict with score (0 or 100) and violations list
         """
         wave1, wave2, wave3, wave4, wave5 = waves
+        is_up = isinstance(wave1, MonoWaveUp)
         violations = []
 
         # Rule 1: Wave 2 cannot retrace more than 100% of Wave 1
-        if isinstance(wave1, MonoWaveUp):
+        if is_up:
             if wave2.low <= wave1.low:
                 violations.append("Wave 2 retraced more than 100% of Wave 1")
         else:
@@ -186,11 +285,12 @@ class ProbabilityScorer:
                 violations.append("Wave 2 retraced more than 100% of Wave 1")
 
         # Rule 2: Wave 3 cannot be the shortest
-        if wave3.length < wave1.length and wave3.length < wave5.length:
+        length3 = wave3.length
+        if length3 < wave1.length and length3 < wave5.length:
             violations.append("Wave 3 is the shortest wave")
 
         # Rule 3: Wave 4 cannot overlap Wave 1
-        if isinstance(wave1, MonoWaveUp):
+        if is_up:
             if wave4.low <= wave1.high:
                 violations.append("Wave 4 overlaps Wave 1 (not a diagonal)")
         else:
@@ -214,19 +314,20 @@ class ProbabilityScorer:
             Dict with score (0 or 100) and violations list
         """
         waveA, waveB, waveC = waves
+        lengthA = waveA.length
         violations = []
 
         # Rule 1: Wave B should not significantly exceed Wave A starting point
         # (allowing for expanded flat up to 123.6%)
         if isinstance(waveA, MonoWaveDown):
-            waveB_retracement = waveB.length / waveA.length if waveA.length > 0 else 0
+            waveB_retracement = waveB.length / lengthA if lengthA > 0 else 0
             if waveB_retracement > 1.40:  # Allow some tolerance beyond 123.6%
                 violations.append(f"Wave B retracement too large: {waveB_retracement:.2f}")
 
         # Rule 2: Wave C should move beyond or near Wave A endpoint
         # (minimum 60% of Wave A for running flat)
-        if waveA.length > 0:
-            waveC_ratio = waveC.length / waveA.length
+        if lengthA > 0:
+            waveC_ratio = waveC.length / lengthA
             if waveC_ratio < 0.50:
                 violations.append(f"Wave C too short relative to Wave A: {waveC_ratio:.2f}")
 
@@ -252,77 +353,20 @@ class ProbabilityScorer:
             Dict with score (0-100) and details
         """
         wave1, wave2, wave3, wave4, wave5 = waves
-        guideline_scores = []
-        details = []
 
-        # Guideline 1: Wave 3 is typically the longest/strongest
-        if wave3.length >= wave1.length and wave3.length >= wave5.length:
-            guideline_scores.append(100)
-            details.append("Wave 3 is longest (ideal)")
-        elif wave3.length >= max(wave1.length, wave5.length) * 0.9:
-            guideline_scores.append(70)
-            details.append("Wave 3 is near longest")
-        else:
-            guideline_scores.append(40)
-            details.append("Wave 3 is not the longest")
-
-        # Guideline 2: Wave 3 extension
-        wave3_ratio = wave3.length / wave1.length if wave1.length > 0 else 0
-        if 1.50 <= wave3_ratio <= 2.70:
-            guideline_scores.append(100)
-            details.append(f"Wave 3 extension ideal: {wave3_ratio:.2f}x")
-        elif 1.20 <= wave3_ratio <= 3.20:
-            guideline_scores.append(70)
-            details.append(f"Wave 3 extension acceptable: {wave3_ratio:.2f}x")
-        else:
-            guideline_scores.append(40)
-            details.append(f"Wave 3 extension weak: {wave3_ratio:.2f}x")
-
-        # Guideline 3: Alternation - Wave 2 and Wave 4 differ in depth
-        wave2_retracement = wave2.length / wave1.length if wave1.length > 0 else 0
-        wave4_retracement = wave4.length / wave3.length if wave3.length > 0 else 0
-
-        retracement_diff = abs(wave2_retracement - wave4_retracement)
-        if retracement_diff > 0.20:
-            guideline_scores.append(100)
-            details.append("Strong alternation between Wave 2 and 4")
-        elif retracement_diff > 0.10:
-            guideline_scores.append(70)
-            details.append("Moderate alternation between Wave 2 and 4")
-        else:
-            guideline_scores.append(40)
-            details.append("Weak alternation between Wave 2 and 4")
-
-        # Guideline 4: Wave equality (when Wave 3 extends, Wave 1 ≈ Wave 5)
-        if wave3.length > wave1.length * 1.3:  # Wave 3 is extended
-            wave5_vs_1 = wave5.length / wave1.length if wave1.length > 0 else 0
-            if 0.85 <= wave5_vs_1 <= 1.15:
-                guideline_scores.append(100)
-                details.append(f"Wave 1 and 5 equality: {wave5_vs_1:.2f}")
-            elif 0.70 <= wave5_vs_1 <= 1.30:
-                guideline_scores.append(70)
-                details.append(f"Wave 1 and 5 near equality: {wave5_vs_1:.2f}")
-            else:
-                guideline_scores.append(40)
-                details.append(f"Wave 1 and 5 not equal: {wave5_vs_1:.2f}")
-        else:
-            guideline_scores.append(50)
-            details.append("Wave 3 not extended (equality N/A)")
-
-        # Guideline 5: Time proportionality
-        wave2_duration = wave2.duration
-        wave4_duration = wave4.duration
-        if wave2_duration > 0 and wave4_duration > 0:
-            duration_ratio = max(wave2_duration, wave4_duration) / min(wave2_duration, wave4_duration)
-            if duration_ratio <= 3:
-                guideline_scores.append(100)
-                details.append("Time proportionality good")
-            elif duration_ratio <= 6:
-                guideline_scores.append(70)
-                details.append("Time proportionality acceptable")
-            else:
-                guideline_scores.append(40)
-                details.append("Time proportionality poor")
+        # Guidelines 1-4: Wave 3 longest, Wave 3 extension, alternation of Wave 2 and 4, equality of Wave 1 and 5
+        score1, score2, score3, score4, score5, wave3_ratio, wave5_vs_1 = impulse_guideline_scores(
+            wave1.length, wave2.length, wave3.length, wave4.length, wave5.length, wave2.duration, wave4.duration)
+        guideline_scores = [score1, score2, score3, score4]
+        details = [self._WAVE3_LONGEST_DETAILS[score1],
+                   self._WAVE3_EXTENSION_DETAILS[score2].format(wave3_ratio),
+                   self._ALTERNATION_DETAILS[score3],
+                   self._EQUALITY_DETAILS[score4].format(wave5_vs_1)]
+
+        # Guideline 5: Time proportionality (only if Wave 2 and Wave 4 have a duration)
+        if score5:
+            guideline_scores.append(score5)
+            details.append(self._TIME_DETAILS[score5])
 
         avg_score = sum(guideline_scores) / len(guideline_scores) if guideline_scores else 0
 
@@ -341,45 +385,18 @@ class ProbabilityScorer:
             Dict with score and details
         """
         waveA, waveB, waveC = waves
-        guideline_scores = []
-        details = []
 
-        # Guideline 1: Wave C relationship to Wave A
-        waveC_vs_A = waveC.length / waveA.length if waveA.length > 0 else 0
-        if 0.90 <= waveC_vs_A <= 1.70:
-            guideline_scores.append(100)
-            details.append(f"Wave C vs A ideal: {waveC_vs_A:.2f}")
-        elif 0.60 <= waveC_vs_A <= 2.70:
-            guideline_scores.append(70)
-            details.append(f"Wave C vs A acceptable: {waveC_vs_A:.2f}")
-        else:
-            guideline_scores.append(40)
-            details.append(f"Wave C vs A weak: {waveC_vs_A:.2f}")
-
-        # Guideline 2: Wave B retracement
-        waveB_vs_A = waveB.length / waveA.length if waveA.length > 0 else 0
-        if 0.38 <= waveB_vs_A <= 0.80:
-            guideline_scores.append(100)
-            details.append(f"Wave B retracement ideal: {waveB_vs_A:.2f}")
-        elif 0.20 <= waveB_vs_A <= 1.00:
-            guideline_scores.append(70)
-            details.append(f"Wave B retracement acceptable: {waveB_vs_A:.2f}")
-        else:
-            guideline_scores.append(40)
-            details.append(f"Wave B retracement unusual: {waveB_vs_A:.2f}")
-
-        # Guideline 3: Time proportionality
-        if waveA.duration > 0:
-            waveC_time_ratio = waveC.duration / waveA.duration
-            if 0.5 <= waveC_time_ratio <= 2.0:
-                guideline_scores.append(100)
-                details.append("Time proportionality good")
-            elif 0.3 <= waveC_time_ratio <= 5.0:
-                guideline_scores.append(70)
-                details.append("Time proportionality acceptable")
-            else:
-                guideline_scores.append(40)
-                details.append("Time proportionality poor")
+        # Guidelines 1-2: Wave C relationship to Wave A, Wave B retracement
+        scoreC, scoreB, score_time, waveC_vs_A, waveB_vs_A = corrective_guideline_scores(
+            waveA.length, waveB.length, waveC.length, waveA.duration, waveC.duration)
+        guideline_scores = [scoreC, scoreB]
+        details = [self._WAVEC_DETAILS[scoreC].format(waveC_vs_A),
+                   self._WAVEB_DETAILS[scoreB].format(waveB_vs_A)]
+
+        # Guideline 3: Time proportionality (only if Wave A has a duration)
+        if score_time:
+            guideline_scores.append(score_time)
+            details.append(self._TIME_DETAILS[score_time])
 
         avg_score = sum(guideline_scores) / len(guideline_scores) if guideline_scores else 0
 
@@ -405,10 +422,27 @@ class ProbabilityScorer:
         structure_scores = []
         details = []
 
+        # Sums and minimums of the wave lengths and of the positive durations, in one pass over the waves
+        total_length = 0
+        min_length = float('inf')
+        total_duration = 0
+        min_duration = float('inf')
+        n_durations = 0
+        for w in waves:
+            length = w.length
+            total_length += length
+            if length < min_length:
+                min_length = length
+
+            duration = w.duration
+            if duration > 0:
+                total_duration += duration
+                n_durations += 1
+                if duration < min_duration:
+                    min_duration = duration
+
         # Check for reasonable wave sizes (no wave is too small)
-        lengths = [w.length for w in waves]
-        avg_length = sum(lengths) / len(lengths)
-        min_length = min(lengths)
+        avg_length = total_length / len(waves)
 
         if min_length > avg_length * 0.15:
             structure_scores.append(100)
@@ -421,10 +455,8 @@ class ProbabilityScorer:
             details.append("Some waves very small")
 
         # Check duration proportionality
-        durations = [w.duration for w in waves if w.duration > 0]
-        if durations:
-            avg_duration = sum(durations) / len(durations)
-            min_duration = min(durations)
+        if n_durations:
+            avg_duration = total_duration / n_durations
 
             if min_duration > avg_duration * 0.1:
                 structure_scores.append(100)
@@ -472,19 +504,22 @@ class ProbabilityScorer:
 
         summary_parts.append(f"Overall Probability: {overall_prob:.1f}%")
 
-        if scores.get('rules_compliance', {}).get('score', 0) == 100:
+        # Only called for scored patterns, which have all scores
+        rules = scores['rules_compliance']
+        if rules['score'] == 100:
             summary_parts.append("✓ All Elliott Wave rules satisfied")
         else:
-            violations = scores.get('rules_compliance', {}).get('violations', [])
-            summary_parts.append(f"✗ Rule violations: {', '.join(violations)}")
+            summary_parts.append(f"✗ Rule violations: {', '.join(rules['violations'])}")
 
-        fib_score = scores.get('fibonacci_ratios', {}).get('score', 0)
-        fib_confirms = scores.get('fibonacci_ratios', {}).get('confirmations', 0)
+        fib = scores['fibonacci_ratios']
+        fib_score = fib['score']
+        fib_confirms = fib['confirmations']
         summary_parts.append(f"Fibonacci Score: {fib_score:.1f}% ({fib_confirms} confirmations)")
 
-        guide_score = scores.get('guidelines', {}).get('score', 0)
-        guide_met = scores.get('guidelines', {}).get('guidelines_met', 0)
-        guide_total = scores.get('guidelines', {}).get('total_guidelines', 0)
+        guidelines = scores['guidelines']
+        guide_score = guidelines['score']
+        guide_met = guidelines['guidelines_met']
+        guide_total = guidelines['total_guidelines']
         summary_parts.append(f"Guidelines: {guide_met}/{guide_total} met ({guide_score:.1f}%)")
 
         return " | ".join(summary_parts)
@@ -6,6 +6,7 @@ using multiple Fibonacci-based methods.
 """
 
 import numpy as np
+from operator import itemgetter
 from typing import Dict, List, Optional, Tuple
 from models.MonoWave import MonoWave, MonoWaveUp, MonoWaveDown
 
@@ -16,6 +17,49 @@ class TargetCalculator:
     and multiple projection methods.
     """
 
+    # Multiples of the reference wave length projected from the base price, one per target
+    _WAVE3_RATIOS = (1.0, 1.618, 2.618, 3.618)
+    _WAVE4_RATIOS = (0.236, 0.382, 0.500)
+    _WAVE5_RATIOS = (0.618, 1.0, 0.618, 1.618)
+    _WAVEC_RATIOS = (0.618, 1.0, 1.618, 2.618)
+
+    # (level, ratio, probability, description) for each target, in ratio order
+    _WAVE3_TARGETS = (
+        ('minimum', '1.0x Wave 1', 0.50, 'Minimum Wave 3 target (equals Wave 1)'),
+        ('common', '1.618x Wave 1', 0.70, 'Most common Wave 3 target (Golden Ratio)'),
+        ('extended', '2.618x Wave 1', 0.40, 'Extended Wave 3 target (strong trend)'),
+        ('very_extended', '3.618x Wave 1', 0.20, 'Very extended Wave 3 target (parabolic)'),
+    )
+    _WAVE4_TARGETS = (
+        ('shallow', '23.6% retracement', 0.60, 'Shallow Wave 4 retracement'),
+        ('common', '38.2% retracement', 0.75, 'Most common Wave 4 retracement'),
+        ('deep', '50% retracement', 0.50, 'Deep Wave 4 retracement'),
+    )
+    # (level, ratio, probability, method, description)
+    _WAVE5_TARGETS = (
+        ('conservative', '0.618x Wave 1', 0.65, 'Fibonacci ratio of Wave 1', 'Conservative Wave 5 target'),
+        ('equality', '1.0x Wave 1', 0.75, 'Wave equality', 'Wave 5 equals Wave 1 (common when Wave 3 extends)'),
+        ('fibonacci_projection', '0.618x Wave 1-3', 0.60, 'Fibonacci projection from Wave 1-3',
+         'Fibonacci projection target'),
+        ('extended', '1.618x Wave 4', 0.50, 'Inverse Wave 4 retracement', 'Extended Wave 5 target'),
+    )
+    _WAVEC_TARGETS = (
+        ('short', '0.618x Wave A', 0.50, 'Short Wave C target'),
+        ('equality', '1.0x Wave A', 0.80, 'Wave C equals Wave A (most common)'),
+        ('extended', '1.618x Wave A', 0.60, 'Extended Wave C target'),
+        ('very_extended', '2.618x Wave A', 0.30, 'Very extended Wave C target'),
+    )
+
+    # Per wave in progress: target method, number of completed waves it needs, error if fewer are given
+    _IMPULSE_TARGET_METHODS = {
+        '3': ('calculate_wave_3_targets', 2, "Need at least Wave 1 and 2 to calculate Wave 3 targets"),
+        '4': ('calculate_wave_4_targets', 3, "Need Wave 1, 2, and 3 to calculate Wave 4 targets"),
+        '5': ('calculate_wave_5_targets', 4, "Need Wave 1, 2, 3, and 4 to calculate Wave 5 targets"),
+    }
+
+    # Magnitude status by code
+    _STATUSES = ('pending', 'reached', 'exceeded')
+
     def __init__(self):
         self.fibonacci_ratios = {
             'retracement': [0.236, 0.382, 0.500, 0.618, 0.786, 0.854],
@@ -45,47 +89,9 @@ class TargetCalculator:
         wave1_length = wave1.length
         wave2_end = wave2.low if is_upward else wave2.high
 
-        targets = []
-
-        # Target 1: Minimum (1.0 * Wave 1)
-        target_min = wave2_end + wave1_length if is_upward else wave2_end - wave1_length
-        targets.append({
-            'level': 'minimum',
-            'price': round(target_min, 2),
-            'ratio': '1.0x Wave 1',
-            'probability': 0.50,
-            'description': 'Minimum Wave 3 target (equals Wave 1)'
-        })
-
-        # Target 2: Common (1.618 * Wave 1)
-        target_common = wave2_end + (wave1_length * 1.618) if is_upward else wave2_end - (wave1_length * 1.618)
-        targets.append({
-            'level': 'common',
-            'price': round(target_common, 2),
-            'ratio': '1.618x Wave 1',
-            'probability': 0.70,
-            'description': 'Most common Wave 3 target (Golden Ratio)'
-        })
-
-        # Target 3: Extended (2.618 * Wave 1)
-        target_extended = wave2_end + (wave1_length * 2.618) if is_upward else wave2_end - (wave1_length * 2.618)
-        targets.append({
-            'level': 'extended',
-            'price': round(target_extended, 2),
-            'ratio': '2.618x Wave 1',
-            'probability': 0.40,
-            'description': 'Extended Wave 3 target (strong trend)'
-        })
+        prices = self._project(wave2_end, wave1_length if is_upward else -wave1_length, self._WAVE3_RATIOS)
 
-        # Target 4: Very Extended (3.618 * Wave 1)
-        target_very_extended = wave2_end + (wave1_length * 3.618) if is_upward else wave2_end - (wave1_length * 3.618)
-        targets.append({
-            'level': 'very_extended',
-            'price': round(target_very_extended, 2),
-            'ratio': '3.618x Wave 1',
-            'probability': 0.20,
-            'description': 'Very extended Wave 3 target (parabolic)'
-        })
+        targets = self._build_targets(self._WAVE3_TARGETS, prices)
 
         result = {
             'wave': 'Wave 3',
@@ -126,37 +132,9 @@ class TargetCalculator:
         wave3_end = wave3.high if is_upward else wave3.low
         wave1_high = wave1.high if is_upward else wave1.low
 
-        targets = []
-
-        # Target 1: Shallow (23.6% retracement)
-        target_shallow = wave3_end - (wave3_length * 0.236) if is_upward else wave3_end + (wave3_length * 0.236)
-        targets.append({
-            'level': 'shallow',
-            'price': round(target_shallow, 2),
-            'ratio': '23.6% retracement',
-            'probability': 0.60,
-            'description': 'Shallow Wave 4 retracement'
-        })
-
-        # Target 2: Common (38.2% retracement)
-        target_common = wave3_end - (wave3_length * 0.382) if is_upward else wave3_end + (wave3_length * 0.382)
-        targets.append({
-            'level': 'common',
-            'price': round(target_common, 2),
-            'ratio': '38.2% retracement',
-            'probability': 0.75,
-            'description': 'Most common Wave 4 retracement'
-        })
+        prices = self._project(wave3_end, -wave3_length if is_upward else wave3_length, self._WAVE4_RATIOS)
 
-        # Target 3: Deep (50% retracement)
-        target_deep = wave3_end - (wave3_length * 0.500) if is_upward else wave3_end + (wave3_length * 0.500)
-        targets.append({
-            'level': 'deep',
-            'price': round(target_deep, 2),
-            'ratio': '50% retracement',
-            'probability': 0.50,
-            'description': 'Deep Wave 4 retracement'
-        })
+        targets = self._build_targets(self._WAVE4_TARGETS, prices)
 
         # Add invalidation level (Wave 1 high/low)
         targets.append({
@@ -207,61 +185,23 @@ class TargetCalculator:
         is_upward = isinstance(wave1, MonoWaveUp)
         wave1_length = wave1.length
         wave4_end = wave4.low if is_upward else wave4.high
+        wave4_length = wave4.length
 
-        targets = []
-
-        # Method 1: Wave 5 = 0.618 * Wave 1
-        target_618 = wave4_end + (wave1_length * 0.618) if is_upward else wave4_end - (wave1_length * 0.618)
-        targets.append({
-            'level': 'conservative',
-            'price': round(target_618, 2),
-            'ratio': '0.618x Wave 1',
-            'probability': 0.65,
-            'method': 'Fibonacci ratio of Wave 1',
-            'description': 'Conservative Wave 5 target'
-        })
-
-        # Method 2: Wave 5 = Wave 1 (equality)
-        target_equality = wave4_end + wave1_length if is_upward else wave4_end - wave1_length
-        targets.append({
-            'level': 'equality',
-            'price': round(target_equality, 2),
-            'ratio': '1.0x Wave 1',
-            'probability': 0.75,
-            'method': 'Wave equality',
-            'description': 'Wave 5 equals Wave 1 (common when Wave 3 extends)'
-        })
-
-        # Method 3: Wave 5 = 0.618 * (Wave 1 to Wave 3)
         if is_upward:
             wave1_to_3_distance = wave3.high - wave1.low
+            moves = (wave1_length, wave1_length, wave1_to_3_distance, wave4_length)
         else:
             wave1_to_3_distance = wave1.high - wave3.low
+            moves = (-wave1_length, -wave1_length, -wave1_to_3_distance, -wave4_length)
 
-        target_13_ratio = wave4_end + (wave1_to_3_distance * 0.618) if is_upward else wave4_end - (wave1_to_3_distance * 0.618)
-        targets.append({
-            'level': 'fibonacci_projection',
-            'price': round(target_13_ratio, 2),
-            'ratio': '0.618x Wave 1-3',
-            'probability': 0.60,
-            'method': 'Fibonacci projection from Wave 1-3',
-            'description': 'Fibonacci projection target'
-        })
+        prices = self._round_prices([wave4_end + move * ratio for move, ratio in zip(moves, self._WAVE5_RATIOS)])
 
-        # Method 4: Inverse retracement of Wave 4 (1.618x)
-        wave4_length = wave4.length
-        target_inverse = wave4_end + (wave4_length * 1.618) if is_upward else wave4_end - (wave4_length * 1.618)
-        targets.append({
-            'level': 'extended',
-            'price': round(target_inverse, 2),
-            'ratio': '1.618x Wave 4',
-            'probability': 0.50,
-            'method': 'Inverse Wave 4 retracement',
-            'description': 'Extended Wave 5 target'
-        })
+        targets = [{'level': level, 'price': price, 'ratio': ratio, 'probability': probability,
+                    'method': method, 'description': description}
+                   for (level, ratio, probability, method, description), price in zip(self._WAVE5_TARGETS, prices)]
 
         # Sort targets by price
-        targets.sort(key=lambda x: x['price'], reverse=is_upward)
+        targets.sort(key=itemgetter('price'), reverse=is_upward)
 
         result = {
             'wave': 'Wave 5',
@@ -300,47 +240,9 @@ class TargetCalculator:
         waveA_length = waveA.length
         waveB_end = waveB.high if is_downward else waveB.low
 
-        targets = []
-
-        # Target 1: Short (0.618 * Wave A)
-        target_short = waveB_end - (waveA_length * 0.618) if is_downward else waveB_end + (waveA_length * 0.618)
-        targets.append({
-            'level': 'short',
-            'price': round(target_short, 2),
-            'ratio': '0.618x Wave A',
-            'probability': 0.50,
-            'description': 'Short Wave C target'
-        })
-
-        # Target 2: Equality (1.0 * Wave A)
-        target_equality = waveB_end - waveA_length if is_downward else waveB_end + waveA_length
-        targets.append({
-            'level': 'equality',
-            'price': round(target_equality, 2),
-            'ratio': '1.0x Wave A',
-            'probability': 0.80,
-            'description': 'Wave C equals Wave A (most common)'
-        })
-
-        # Target 3: Extended (1.618 * Wave A)
-        target_extended = waveB_end - (waveA_length * 1.618) if is_downward else waveB_end + (waveA_length * 1.618)
-        targets.append({
-            'level': 'extended',
-            'price': round(target_extended, 2),
-            'ratio': '1.618x Wave A',
-            'probability': 0.60,
-            'description': 'Extended Wave C target'
-        })
+        prices = self._project(waveB_end, -waveA_length if is_downward else waveA_length, self._WAVEC_RATIOS)
 
-        # Target 4: Very Extended (2.618 * Wave A)
-        target_very_extended = waveB_end - (waveA_length * 2.618) if is_downward else waveB_end + (waveA_length * 2.618)
-        targets.append({
-            'level': 'very_extended',
-            'price': round(target_very_extended, 2),
-            'ratio': '2.618x Wave A',
-            'probability': 0.30,
-            'description': 'Very extended Wave C target'
-        })
+        targets = self._build_targets(self._WAVEC_TARGETS, prices)
 
         result = {
             'wave': 'Wave C',
@@ -357,6 +259,35 @@ class TargetCalculator:
 
         return result
 
+    def _project(self, base_price: float, move: float, ratios: Tuple[float, ...]) -> List[float]:
+        """
+        Projects base_price + move * ratio for each ratio, rounded to 2 decimals.
+
+        move is the signed reference wave length, so one expression serves both directions.
+        """
+        return self._round_prices([base_price + move * ratio for ratio in ratios])
+
+    @staticmethod
+    def _round_prices(prices: List[float]) -> List[float]:
+        """
+        Rounds each price to 2 decimals, with the same values and number types as round(price, 2).
+
+        NumPy floats are rounded with one np.round call, which gives the same values as round() on each of
+        them at a fraction of the cost. Python floats keep using round(), which can differ from np.round on ties.
+        """
+        if all(isinstance(price, np.floating) for price in prices):
+            return list(np.round(np.array(prices), 2))
+
+        return [round(price, 2) for price in prices]
+
+    @staticmethod
+    def _build_targets(templates: Tuple[Tuple, ...], prices: List[float]) -> List[Dict]:
+        """
+        Pairs each (level, ratio, probability, description) template with its price.
+        """
+        return [{'level': level, 'price': price, 'ratio': ratio, 'probability': probability, 'description': description}
+                for (level, ratio, probability, description), price in zip(templates, prices)]
+
     def _calculate_magnitudes(self, current_price: float, targets: List[Dict],
                              is_upward: bool) -> List[Dict]:
         """
@@ -370,30 +301,41 @@ class TargetCalculator:
         Returns:
             List of magnitude dicts
         """
+        prices = np.fromiter((target['price'] for target in targets), dtype=np.float64, count=len(targets))
+        distances = prices - current_price
+        has_price = current_price > 0
+        distance_pcts = distances / current_price * 100 if has_price else distances
+
+        # np.round on the arrays gives the same values as round() on each NumPy float, at a fraction of the cost.
+        # Python floats keep using round(), which can differ from np.round on ties.
+        rounded_distances = np.round(distances, 2)
+        rounded_pcts = np.round(distance_pcts, 2)
+        numpy_current = isinstance(current_price, np.floating)
+
+        # Pending if the target is still ahead in the wave's direction, else reached if within 0.5%, else exceeded
+        pending = distances > 0 if is_upward else distances < 0
+        reached = np.abs(distances) < (current_price * 0.005)
+        status_codes = np.where(pending, 0, np.where(reached, 1, 2))
+
         magnitudes = []
 
-        for target in targets:
+        for k, target in enumerate(targets):
             target_price = target['price']
-            distance = target_price - current_price
-            distance_pct = (distance / current_price * 100) if current_price > 0 else 0
-
-            # Check if target is in the correct direction
-            if is_upward and distance > 0:
-                status = 'pending'
-            elif not is_upward and distance < 0:
-                status = 'pending'
-            elif abs(distance) < (current_price * 0.005):  # Within 0.5%
-                status = 'reached'
+
+            if numpy_current or isinstance(target_price, np.floating):
+                rounded_distance = rounded_distances[k]
+                rounded_pct = rounded_pcts[k] if has_price else 0
             else:
-                status = 'exceeded'
+                rounded_distance = round(float(distances[k]), 2)
+                rounded_pct = round(float(distance_pcts[k]), 2) if has_price else 0
 
             magnitudes.append({
                 'level': target['level'],
                 'target_price': target_price,
                 'current_price': current_price,
-                'distance': round(distance, 2),
-                'distance_pct': round(distance_pct, 2),
-                'status': status,
+                'distance': rounded_distance,
+                'distance_pct': rounded_pct,
+                'status': self._STATUSES[status_codes[k]],
                 'probability': target.get('probability', 0)
             })
 
@@ -413,23 +355,14 @@ class TargetCalculator:
         Returns:
             Complete target analysis
         """
-        if current_wave == '3':
-            if len(waves) < 2:
-                raise ValueError("Need at least Wave 1 and 2 to calculate Wave 3 targets")
-            return self.calculate_wave_3_targets(waves[0], waves[1], current_price)
+        if current_wave not in self._IMPULSE_TARGET_METHODS:
+            raise ValueError(f"Unknown wave: {current_wave}. Must be '3', '4', or '5'")
 
-        elif current_wave == '4':
-            if len(waves) < 3:
-                raise ValueError("Need Wave 1, 2, and 3 to calculate Wave 4 targets")
-            return self.calculate_wave_4_targets(waves[0], waves[1], waves[2], current_price)
+        method, n_waves, message = self._IMPULSE_TARGET_METHODS[current_wave]
+        if len(waves) < n_waves:
+            raise ValueError(message)
 
-        elif current_wave == '5':
-            if len(waves) < 4:
-                raise ValueError("Need Wave 1, 2, 3, and 4 to calculate Wave 5 targets")
-            return self.calculate_wave_5_targets(waves[0], waves[1], waves[2], waves[3], current_price)
-
-        else:
-            raise ValueError(f"Unknown wave: {current_wave}. Must be '3', '4', or '5'")
+        return getattr(self, method)(*waves[:n_waves], current_price)
 
     def calculate_support_resistance_levels(self, waves: List[MonoWave]) -> Dict:
         """
@@ -444,6 +377,19 @@ class TargetCalculator:
         highs = [w.high for w in waves]
         lows = [w.low for w in waves]
 
+        if highs and all(isinstance(price, np.floating) for price in highs + lows):
+            # NumPy prices (as the analyzer's waves hold): np.unique sorts and dedups in one pass, and np.round
+            # gives the same values as round() on each NumPy float
+            resistance_levels = np.round(np.unique(highs)[::-1], 2)
+            support_levels = np.round(np.unique(lows), 2)
+
+            return {
+                'resistance_levels': list(resistance_levels),
+                'support_levels': list(support_levels),
+                'major_resistance': resistance_levels[0],
+                'major_support': support_levels[0]
+            }
+
         # Get unique levels
         resistance_levels = sorted(set(highs), reverse=True)
         support_levels = sorted(set(lows))
@@ -105,7 +105,7 @@ class WaveAnalyzer:
             if self.verbose: print("Wave 5 has no End in Data")
             return False
 
-        if self.lows[wave4.low_idx:wave5.high_idx].any() and wave4.low > np.min(self.lows[wave4.low_idx:wave5.high_idx]):
+        if wave5.high_idx > wave4.low_idx and wave4.low > np.min(self.lows[wave4.low_idx:wave5.high_idx]):
             if self.verbose: print('Low of Wave 4 higher than a low between Wave 4 and Wave 5')
             return False
 
@@ -93,6 +93,7 @@ class WaveOptionsGenerator(ABC):
     def __init__(self, up_to: int):
         self.__up_to = up_to
         self.options = self.populate()
+        self.__options_sorted = None
 
     @property
     def up_to(self):
@@ -110,10 +111,13 @@ class WaveOptionsGenerator(ABC):
     def options_sorted(self):
         """
         Will sort from small to large values [0,0,0,0,0] -> [n, n, n, n, n]
+
+        The options are sorted once and the same list is returned on every access, so it must not be modified.
         :return:
         """
-        all_options = list(self.options)
-        return sorted(all_options)
+        if self.__options_sorted is None:
+            self.__options_sorted = sorted(self.options)
+        return self.__options_sorted
 
 
 class WaveOptionsGenerator5(WaveOptionsGenerator):
@@ -1,5 +1,6 @@
+import numpy as np
 from models.WaveRules import WaveRule
-from models.MonoWave import MonoWaveUp, MonoWaveDown
+from models.MonoWave import MonoWaveUp, MonoWaveDown, MonoWaveArrays
 
 
 class WavePattern:
@@ -70,6 +71,39 @@ class WavePattern:
 
         return True
 
+    @staticmethod
+    def check_rule_batch(waves_list: list, waverule: WaveRule, wave_arrays: list = None) -> np.ndarray:
+        """
+        Checks a WaveRule for many wave patterns at once, given as lists of consecutive MonoWaves (all of the
+        same length). Same result as WavePattern(waves).check_rule(waverule) for each of them.
+
+        :param waves_list: list of lists of MonoWaves
+        :param waverule:
+        :param wave_arrays: the waves_list as one MonoWaveArrays per wave, if already built
+        :return: boolean array, True where all WaveRules are fullfilled
+        """
+        valid = np.ones(len(waves_list), dtype=bool)
+        if not waves_list:
+            return valid
+
+        if wave_arrays is None:
+            wave_arrays = MonoWaveArrays.from_patterns(waves_list)
+        wave_arrays = {f'wave{i+1}': arrays for i, arrays in enumerate(wave_arrays)}
+
+        for rule, conditions in waverule.conditions.items():
+            wave_keys = conditions.get('waves')
+            function = conditions.get('function')
+
+            try:
+                valid &= np.asarray(function(*[wave_arrays.get(key) for key in wave_keys]), dtype=bool)
+            except (ValueError, TypeError):
+                # the condition uses python and / or / not (ValueError) or scalar-only functions like math.log
+                # (TypeError), check the still valid patterns one by one
+                for k in np.flatnonzero(valid):
+                    valid[k] = function(*[waves_list[k][int(key[4:]) - 1] for key in wave_keys])
+
+        return valid
+
     @property
     def low(self) -> float:
         return self.__waves[0].low
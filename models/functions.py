@@ -97,4 +97,216 @@ def lo(lows_arr: np.array, highs_arr: np.array, idx_start):
         else:
             return low, low_idx
 
-    return low, low_idx
\ No newline at end of file
+    return low, low_idx
+
+
+@njit
+def find_end_up(lows_arr: np.array, highs_arr: np.array, idx_start: int, skip: int):
+    """
+    Finds the end of a MonoWaveUp starting at idx_start, skipping [skip] intermediate highs
+    (the loop of MonoWaveUp.find_end with next_hi inlined)
+
+    :return: high, high_idx (high_idx is -1 if no end can be found)
+    """
+    high, high_idx = hi(lows_arr, highs_arr, idx_start)
+    low_at_start = lows_arr[idx_start]
+
+    for _ in range(skip):
+        # next_hi(lows_arr, highs_arr, high_idx, high)
+        act_high = lows_arr[high_idx]
+        act_high_idx = -1
+        prev_high_reached = False
+        found = False
+
+        for idx in range(high_idx + 1, len(highs_arr)):
+            if highs_arr[idx] < high and not prev_high_reached:
+                continue
+            elif highs_arr[idx] > high and not prev_high_reached:
+                prev_high_reached = True
+                act_high = highs_arr[idx]
+                act_high_idx = idx
+            elif highs_arr[idx] > act_high:
+                act_high = highs_arr[idx]
+                act_high_idx = idx
+            else:
+                found = True
+                break
+
+        if not found:
+            return high, -1
+
+        if act_high > high:
+            high = act_high
+            high_idx = act_high_idx
+
+            all_lower = True
+            for idx in range(idx_start, act_high_idx):
+                if not lows_arr[idx] < low_at_start:
+                    all_lower = False
+                    break
+            if all_lower:
+                return high, -1
+
+    return high, high_idx
+
+
+@njit
+def find_end_down(lows_arr: np.array, highs_arr: np.array, idx_start: int, skip: int):
+    """
+    Finds the end of a MonoWaveDown starting at idx_start, skipping [skip] intermediate lows
+    (the loop of MonoWaveDown.find_end with next_lo inlined)
+
+    :return: low, low_idx (low_idx is -1 if no end can be found)
+    """
+    low, low_idx = lo(lows_arr, highs_arr, idx_start)
+    high_at_start = highs_arr[idx_start]
+
+    for _ in range(skip):
+        # next_lo(lows_arr, highs_arr, low_idx, low)
+        act_low = highs_arr[low_idx]
+        act_low_idx = -1
+        prev_low_reached = False
+        found = False
+
+        for idx in range(low_idx + 1, len(lows_arr)):
+            if lows_arr[idx] > low and not prev_low_reached:
+                continue
+            elif lows_arr[idx] < low and not prev_low_reached:
+                prev_low_reached = True
+                act_low = lows_arr[idx]
+                act_low_idx = idx
+            elif lows_arr[idx] < act_low:
+                act_low = lows_arr[idx]
+                act_low_idx = idx
+            else:
+                found = True
+                break
+
+        if not found:
+            return low, -1
+
+        if act_low < low:
+            low = act_low
+            low_idx = act_low_idx
+
+            for idx in range(idx_start, act_low_idx):
+                if highs_arr[idx] > high_at_start:
+                    return low, -1
+
+    return low, low_idx
+
+
+@njit
+def match_ratios(actual_ratio: float, expected_ratios: np.array, tolerance: float):
+    """
+    Compares actual_ratio with every (positive) expected ratio, a ratio matches if its relative deviation
+    |actual_ratio - expected| / expected is within tolerance. The score of a match is 1 - relative_deviation /
+    tolerance.
+
+    :return: idx, deviation, relative_deviation, score (arrays over the matching expected ratios)
+    """
+    n = len(expected_ratios)
+    idx = np.empty(n, dtype=np.int64)
+    deviation = np.empty(n)
+    relative_deviation = np.empty(n)
+    score = np.empty(n)
+
+    count = 0
+    for i in range(n):
+        expected = expected_ratios[i]
+        if not expected > 0:
+            continue
+
+        dev = abs(actual_ratio - expected)
+        rel = dev / expected
+        if rel <= tolerance:
+            idx[count] = i
+            deviation[count] = dev
+            relative_deviation[count] = rel
+            score[count] = 1.0 - rel / tolerance
+            count += 1
+
+    return idx[:count], deviation[:count], relative_deviation[:count], score[:count]
+
+
+@njit
+def band_score(value: float, ideal_low: float, ideal_high: float, low: float, high: float) -> int:
+    """
+    100 if value is within [ideal_low, ideal_high], 70 if it is within [low, high], else 40
+    """
+    if ideal_low <= value <= ideal_high:
+        return 100
+    elif low <= value <= high:
+        return 70
+    return 40
+
+
+@njit
+def impulse_guideline_scores(length1: float, length2: float, length3: float, length4: float, length5: float,
+                             duration2: int, duration4: int):
+    """
+    Scores of the five impulse guidelines (Wave 3 longest, Wave 3 extension, alternation of Wave 2 and 4,
+    equality of Wave 1 and 5, time proportionality of Wave 2 and 4). The time proportionality score is 0 if
+    Wave 2 or Wave 4 has no duration.
+
+    :return: score1, score2, score3, score4, score5, wave3_ratio, wave5_vs_1
+    """
+    if length3 >= length1 and length3 >= length5:
+        score1 = 100
+    elif length3 >= max(length1, length5) * 0.9:
+        score1 = 70
+    else:
+        score1 = 40
+
+    wave3_ratio = length3 / length1 if length1 > 0 else 0.0
+    score2 = band_score(wave3_ratio, 1.50, 2.70, 1.20, 3.20)
+
+    wave2_retracement = length2 / length1 if length1 > 0 else 0.0
+    wave4_retracement = length4 / length3 if length3 > 0 else 0.0
+    retracement_diff = abs(wave2_retracement - wave4_retracement)
+    if retracement_diff > 0.20:
+        score3 = 100
+    elif retracement_diff > 0.10:
+        score3 = 70
+    else:
+        score3 = 40
+
+    wave5_vs_1 = 0.0
+    if length3 > length1 * 1.3:
+        wave5_vs_1 = length5 / length1 if length1 > 0 else 0.0
+        score4 = band_score(wave5_vs_1, 0.85, 1.15, 0.70, 1.30)
+    else:
+        score4 = 50
+
+    score5 = 0
+    if duration2 > 0 and duration4 > 0:
+        duration_ratio = max(duration2, duration4) / min(duration2, duration4)
+        if duration_ratio <= 3:
+            score5 = 100
+        elif duration_ratio <= 6:
+            score5 = 70
+        else:
+            score5 = 40
+
+    return score1, score2, score3, score4, score5, wave3_ratio, wave5_vs_1
+
+
+@njit
+def corrective_guideline_scores(lengthA: float, lengthB: float, lengthC: float, durationA: int, durationC: int):
+    """
+    Scores of the three corrective guidelines (Wave C vs A, Wave B retracement, time proportionality of Wave C
+    and A). The time proportionality score is 0 if Wave A has no duration.
+
+    :return: scoreC, scoreB, score_time, waveC_vs_A, waveB_vs_A
+    """
+    waveC_vs_A = lengthC / lengthA if lengthA > 0 else 0.0
+    scoreC = band_score(waveC_vs_A, 0.90, 1.70, 0.60, 2.70)
+
+    waveB_vs_A = lengthB / lengthA if lengthA > 0 else 0.0
+    scoreB = band_score(waveB_vs_A, 0.38, 0.80, 0.20, 1.00)
+
+    score_time = 0
+    if durationA > 0:
+        score_time = band_score(durationC / durationA, 0.5, 2.0, 0.3, 5.0)
+
+    return scoreC, scoreB, score_time, waveC_vs_A, waveB_vs_A
@@ -0,0 +1,259 @@
+"""
+Plots and reports for Elliott Wave analysis scripts
+
+Shared by the XRP/USDT scripts (test_xrp_demo.py, test_xrp_kucoin.py): a candlestick chart with the
+best wave pattern, its price targets and probability breakdown, and a printed analysis report.
+"""
+
+from pathlib import Path
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+
+def create_detailed_plot(df, analyzer, best_candidate, targets_info=None, symbol="XRP/USDT", write_png=False):
+    """
+    Create a comprehensive Elliott Wave analysis plot with annotations.
+
+    The plot is always saved as HTML; the PNG export (through Kaleido, which takes seconds) only runs
+    if write_png is set.
+
+    Args:
+        df: Price DataFrame
+        analyzer: EnhancedWaveAnalyzer instance
+        best_candidate: Best wave candidate found
+        targets_info: Optional price targets information
+        symbol: Trading pair symbol for title
+        write_png: Also save the plot as PNG
+    """
+    print("Creating detailed plot...")
+
+    # Create subplots
+    fig = make_subplots(
+        rows=2, cols=1,
+        row_heights=[0.7, 0.3],
+        subplot_titles=(f'Elliott Wave Analysis - {symbol}', 'Probability Breakdown'),
+        vertical_spacing=0.1
+    )
+
+    # Add OHLC candlestick chart
+    fig.add_trace(
+        go.Candlestick(
+            x=df['Date'],
+            open=df['Open'],
+            high=df['High'],
+            low=df['Low'],
+            close=df['Close'],
+            name=symbol
+        ),
+        row=1, col=1
+    )
+
+    # Add Elliott Wave pattern lines
+    pattern = best_candidate.pattern
+    fig.add_trace(
+        go.Scatter(
+            x=pattern.dates,
+            y=pattern.values,
+            text=pattern.labels,
+            mode='lines+markers+text',
+            name='Elliott Waves',
+            textposition='top center',
+            textfont=dict(size=14, color='white', family='Arial Black'),
+            line=dict(color='rgb(255, 215, 0)', width=4),
+            marker=dict(size=12, color='rgb(255, 215, 0)', symbol='circle')
+        ),
+        row=1, col=1
+    )
+
+    # Add price targets if available
+    if targets_info and 'targets' in targets_info:
+        targets = targets_info['targets']
+        current_price = analyzer.get_current_price()
+
+        for target in targets['targets']:
+            # Determine color based on target level
+            if target['level'] == 'conservative':
+                color = 'cyan'
+            elif target['level'] == 'moderate':
+                color = 'yellow'
+            else:
+                color = 'orange'
+
+            # Add horizontal line for each target
+            fig.add_hline(
+                y=target['price'],
+                line_dash="dash",
+                line_color=color,
+                annotation_text=f"{target['level'].upper()}: ${target['price']:.4f}",
+                annotation_position="right",
+                row=1, col=1
+            )
+
+    # Add probability breakdown bar chart
+    prob_scores = best_candidate.probability_analysis['scores']
+    categories = ['Rules', 'Fibonacci', 'Guidelines', 'Structure']
+    scores = [
+        prob_scores['rules_compliance']['score'],
+        prob_scores['fibonacci_ratios']['score'],
+        prob_scores['guidelines']['score'],
+        prob_scores['structure_quality']['score']
+    ]
+
+    colors = ['green' if s >= 70 else 'yellow' if s >= 50 else 'red' for s in scores]
+
+    fig.add_trace(
+        go.Bar(
+            x=categories,
+            y=scores,
+            text=[f"{s:.1f}%" for s in scores],
+            textposition='outside',
+            marker_color=colors,
+            name='Probability Scores'
+        ),
+        row=2, col=1
+    )
+
+    # Update layout
+    fig.update_layout(
+        title={
+            'text': f"<b>{symbol} Elliott Wave Analysis</b><br>" +
+                   f"<span style='font-size:14px'>Overall Probability: {best_candidate.probability:.1f}% " +
+                   f"({best_candidate.probability_analysis['category']})</span><br>" +
+                   f"<span style='font-size:12px'>Wave Options: {best_candidate.wave_options}</span>",
+            'x': 0.5,
+            'xanchor': 'center',
+            'font': {'size': 18}
+        },
+        height=900,
+        showlegend=True,
+        template='plotly_dark',
+        hovermode='x unified'
+    )
+
+    # Update axes
+    fig.update_xaxes(title_text="Date", row=1, col=1)
+    fig.update_yaxes(title_text="Price (USDT)", row=1, col=1)
+    fig.update_yaxes(title_text="Score (%)", range=[0, 110], row=2, col=1)
+
+    # Remove rangeslider
+    fig.update_xaxes(rangeslider_visible=False, row=1, col=1)
+
+    # Save the plot
+    Path("images").mkdir(parents=True, exist_ok=True)
+
+    timestamp = pd.Timestamp.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"./images/{symbol.replace('/', '_')}_Elliott_Wave_{timestamp}"
+
+    fig.write_html(f"{filename}.html")
+    print(f"✓ Plot saved as HTML to: {filename}.html")
+
+    if write_png:
+        try:
+            fig.write_image(f"{filename}.png", width=1920, height=1080)
+            print(f"✓ Plot saved to: {filename}.png")
+        except Exception as e:
+            print(f"⚠ Could not save as PNG: {e}")
+
+    return fig
+
+
+def print_detailed_analysis(best_candidate, targets_info, current_price):
+    """Print comprehensive analysis report."""
+    print("\n" + "=" * 80)
+    print("DETAILED ELLIOTT WAVE ANALYSIS REPORT")
+    print("=" * 80)
+
+    # Overall Assessment
+    print(f"\n📊 OVERALL ASSESSMENT:")
+    print(f"   Probability Score: {best_candidate.probability:.1f}%")
+    print(f"   Category: {best_candidate.probability_analysis['category']}")
+    print(f"   Wave Type: {best_candidate.wave_type.upper()}")
+    print(f"   Wave Configuration: {best_candidate.wave_options}")
+
+    # Probability Breakdown
+    print(f"\n📈 PROBABILITY BREAKDOWN:")
+    scores = best_candidate.probability_analysis['scores']
+
+    print(f"   Rules Compliance: {scores['rules_compliance']['score']:.1f}%")
+    if 'violations' in scores['rules_compliance'] and scores['rules_compliance']['violations']:
+        print(f"      Violations:")
+        for violation in scores['rules_compliance']['violations']:
+            print(f"         ✗ {violation}")
+    else:
+        print(f"      ✓ All Elliott Wave rules satisfied")
+
+    print(f"\n   Fibonacci Ratios: {scores['fibonacci_ratios']['score']:.1f}%")
+    fib_details = scores['fibonacci_ratios']['details']
+
+    if 'wave2_retracement' in fib_details:
+        w2 = fib_details['wave2_retracement']
+        print(f"      Wave 2 Retracement: {w2['ratio']:.3f} (Quality: {w2['quality']*100:.0f}%)")
+        if w2.get('matches'):
+            matches_str = ', '.join([f"{m['fibonacci_ratio']:.3f}" for m in w2['matches'][:3]])
+            print(f"         Matches: {matches_str}")
+
+    if 'wave3_extension' in fib_details:
+        w3 = fib_details['wave3_extension']
+        print(f"      Wave 3 Extension: {w3['ratio']:.3f} (Quality: {w3['quality']*100:.0f}%)")
+        if w3.get('matches'):
+            matches_str = ', '.join([f"{m['fibonacci_ratio']:.3f}" for m in w3['matches'][:3]])
+            print(f"         Matches: {matches_str}")
+
+    if 'wave4_retracement' in fib_details:
+        w4 = fib_details['wave4_retracement']
+        print(f"      Wave 4 Retracement: {w4['ratio']:.3f} (Quality: {w4['quality']*100:.0f}%)")
+
+    print(f"\n   Guidelines: {scores['guidelines']['score']:.1f}%")
+    if 'details' in scores['guidelines']:
+        for detail in scores['guidelines']['details']:
+            print(f"      • {detail}")
+
+    print(f"\n   Structure Quality: {scores['structure_quality']['score']:.1f}%")
+
+    # Price Targets
+    if targets_info and 'targets' in targets_info:
+        print(f"\n🎯 PRICE TARGETS:")
+        targets = targets_info['targets']
+        print(f"   Current Price: ${current_price:.4f}")
+        print(f"   Direction: {targets['direction']}")
+        print(f"   Base Price: ${targets['base_price']:.4f}")
+        print()
+
+        for target in targets['targets']:
+            prob_str = f"{target.get('probability', 0)*100:.0f}%"
+            distance = target['price'] - current_price
+            distance_pct = (distance / current_price) * 100
+
+            print(f"   {target['level'].upper()}:")
+            print(f"      Target Price: ${target['price']:.4f}")
+            print(f"      Distance: ${distance:.4f} ({distance_pct:+.2f}%)")
+            print(f"      Ratio: {target['ratio']}")
+            print(f"      Probability: {prob_str}")
+            if 'description' in target:
+                print(f"      Description: {target['description']}")
+            print()
+
+    # Wave Details
+    print(f"\n📏 WAVE MEASUREMENTS:")
+    pattern = best_candidate.pattern
+    waves = list(pattern.waves.values())
+
+    for i, wave in enumerate(waves):
+        wave_label = wave.label
+        wave_length = wave.length
+        duration = wave.duration
+
+        # Get start/end points based on wave direction
+        points = wave.points
+        start_price = points[0]
+        end_price = points[1]
+
+        print(f"   Wave {wave_label}:")
+        print(f"      Start: {wave.date_start} @ ${start_price:.4f}")
+        print(f"      End: {wave.date_end} @ ${end_price:.4f}")
+        print(f"      Length: ${wave_length:.4f}")
+        print(f"      Duration: {duration} candles")
+        print()
+
+    print("=" * 80)
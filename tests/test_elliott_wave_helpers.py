@@ -0,0 +1,57 @@
+from freqtrade.elliott_wave_helpers import FreqtradeElliotWaveHelper
+import numpy as np
+import pandas as pd
+from types import SimpleNamespace
+
+
+def _indicator_frame():
+    df = pd.DataFrame({'close': [1.0, 2.0, 3.0]})
+    df = FreqtradeElliotWaveHelper.add_wave_indicators(df, {'found': False})
+    df['ew_probability'] = 80.0
+    df['ew_fib_score'] = 70.0
+    df['ew_target_1'] = 5.0
+    df['ew_wave_type'] = 'impulse'
+    return df
+
+
+def _pattern(idx_start):
+    waves = {}
+    for i in range(5):
+        low_idx, high_idx = (idx_start + i, idx_start + i + 1) if i % 2 == 0 else (idx_start + i + 1, idx_start + i)
+        waves[f'wave{i + 1}'] = SimpleNamespace(low_idx=low_idx, high_idx=high_idx,
+                                                low=10.0 + low_idx, high=20.0 + high_idx, label=None)
+    return SimpleNamespace(waves=waves)
+
+
+def test_entry_signal_follows_wave_type_column():
+    df = _indicator_frame()
+    assert FreqtradeElliotWaveHelper.generate_entry_signal(df, wave_type='impulse').all()
+
+    df['ew_wave_type'] = 'none'
+    assert not FreqtradeElliotWaveHelper.generate_entry_signal(df, wave_type='impulse').any()
+    assert not FreqtradeElliotWaveHelper.calculate_confidence_and_entry(df, wave_type='impulse')[1].any()
+
+
+def test_indicator_frames_concat_and_merge():
+    a = _indicator_frame()
+    b = _indicator_frame()
+
+    assert len(pd.concat([a, b])) == 6
+    assert len(a.merge(b, on='close')) == 3
+
+
+def test_plot_config_is_not_shared_between_calls():
+    config = FreqtradeElliotWaveHelper.create_plot_config('ew')
+    config['main_plot']['X'] = {'color': 'red'}
+
+    assert 'X' not in FreqtradeElliotWaveHelper.create_plot_config('ew')['main_plot']
+
+
+def test_update_wave_points_replaces_previous_pattern():
+    df = pd.DataFrame({'close': np.arange(20, dtype=float)})
+    df = FreqtradeElliotWaveHelper.mark_wave_points(df, _pattern(2))
+    df = FreqtradeElliotWaveHelper.update_wave_points(df, _pattern(9))
+
+    expected = FreqtradeElliotWaveHelper.mark_wave_points(pd.DataFrame({'close': np.arange(20, dtype=float)}),
+                                                          _pattern(9))
+    pd.testing.assert_frame_equal(df, expected)
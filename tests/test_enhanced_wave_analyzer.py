@@ -0,0 +1,134 @@
+from models.EnhancedWaveAnalyzer import EnhancedWaveAnalyzer, IMPULSE_WAVES, CORRECTIVE_WAVES
+from models.MonoWave import MonoWaveArrays
+from models.WavePattern import WavePattern
+from pathlib import Path
+from types import SimpleNamespace
+import math
+import numpy as np
+import pandas as pd
+import pytest
+
+DATA_DIR = Path(__file__).resolve().parent.parent / 'data'
+
+
+def _random_analyzer(n=300):
+    rng = np.random.default_rng(0)
+    lows = rng.random(n) * 100
+    df = pd.DataFrame({'Date': np.arange(n), 'Low': lows, 'High': lows + 1, 'Close': lows + 0.5})
+    return EnhancedWaveAnalyzer(df)
+
+
+def test_min_low_matches_np_min():
+    analyzer = _random_analyzer()
+    rng = np.random.default_rng(1)
+
+    for _ in range(1000):
+        idx_from, idx_to = sorted(rng.choice(len(analyzer.lows) + 1, size=2, replace=False))
+        assert analyzer._min_low(idx_from, idx_to) == np.min(analyzer.lows[idx_from:idx_to])
+
+
+def test_min_low_raises_value_error_on_empty_range():
+    analyzer = _random_analyzer()
+
+    with pytest.raises(ValueError):
+        analyzer._min_low(10, 10)
+    with pytest.raises(ValueError):
+        analyzer._min_low(10, 5)
+
+
+def _btc_analyzer():
+    analyzer = EnhancedWaveAnalyzer(pd.read_csv(DATA_DIR / 'btc-usd_1d.csv'))
+    analyzer.set_combinatorial_limits(n_impulse=6, n_correction=6)
+    return analyzer
+
+
+def _found_patterns(analyzer, idx_start):
+    impulses = list(analyzer._iter_wave_options(analyzer._impulse_option_tree, IMPULSE_WAVES, idx_start,
+                                                analyzer._impulse_invalidated))
+    corrections = list(analyzer._iter_wave_options(analyzer._correction_option_tree, CORRECTIVE_WAVES, idx_start))
+    return impulses, corrections
+
+
+def test_pruned_search_finds_the_same_waves_as_the_full_search():
+    analyzer = _btc_analyzer()
+
+    for idx_start in (0, 25, 60, 100):
+        impulses, corrections = _found_patterns(analyzer, idx_start)
+
+        expected = [(option, analyzer._find_impulsive_wave(idx_start, option))
+                    for option in analyzer._impulse_options.tolist()]
+        assert impulses == [(option, waves) for option, waves in expected if waves]
+
+        expected = [(option, analyzer._find_corrective_wave(idx_start, option))
+                    for option in analyzer._correction_options.tolist()]
+        assert corrections == [(option, waves) for option, waves in expected if waves]
+
+
+def test_batch_rule_checks_match_the_scalar_rule_checks():
+    analyzer = _btc_analyzer()
+    scorer = analyzer.prob_scorer
+    n_checked = 0
+
+    for idx_start in (0, 25, 60, 100):
+        impulses, corrections = _found_patterns(analyzer, idx_start)
+
+        for rules, patterns, rules_batch, score_rules in (
+                ((analyzer.impulse_rule, analyzer.diagonal_rule), impulses,
+                 scorer.impulse_rules_batch, scorer._score_impulse_rules),
+                ((analyzer.correction_rule,), corrections,
+                 scorer.corrective_rules_batch, scorer._score_corrective_rules)):
+            waves_list = [waves for _, waves in patterns]
+            if not waves_list:
+                continue
+            wave_arrays = MonoWaveArrays.from_patterns(waves_list)
+
+            for rule in rules:
+                expected = [WavePattern(waves, verbose=False).check_rule(rule) for waves in waves_list]
+                assert WavePattern.check_rule_batch(waves_list, rule, wave_arrays).tolist() == expected
+
+            expected = [score_rules(waves)['score'] == 100 for waves in waves_list]
+            assert rules_batch(wave_arrays).tolist() == expected
+            n_checked += len(waves_list)
+
+    assert n_checked > 0
+
+
+def test_monowave_cache_is_bounded():
+    analyzer = _btc_analyzer()
+    analyzer._MONOWAVE_CACHE_SIZE = 50
+
+    for idx_start in (0, 25, 60, 100):
+        _found_patterns(analyzer, idx_start)
+        assert len(analyzer._monowave_cache) <= 50
+
+    # a search with evicted MonoWaves finds the same waves again
+    def spans(analyzer):
+        return [(option, [(wave.idx_start, wave.idx_end) for wave in waves])
+                for option, waves in _found_patterns(analyzer, 0)[0]]
+
+    assert spans(analyzer) == spans(_btc_analyzer())
+
+
+def test_candidates_cache_is_bounded():
+    analyzer = _btc_analyzer()
+    analyzer._CANDIDATES_CACHE_SIZE = 3
+
+    def results():
+        return [[(candidate.wave_options, candidate.probability) for candidate in analyzer.find_best_impulse_waves(i)]
+                for i in range(6)]
+
+    first = results()
+    assert len(analyzer._candidates_cache) == 3
+    assert results() == first
+
+
+def test_batch_rule_check_falls_back_to_scalar_functions():
+    analyzer = _btc_analyzer()
+    impulses, _ = _found_patterns(analyzer, 0)
+    waves_list = [waves for _, waves in impulses]
+    rule = SimpleNamespace(conditions={
+        'log_length': {'waves': ['wave1', 'wave3'],
+                       'function': lambda wave1, wave3: math.log(wave3.length) > math.log(wave1.length)}})
+
+    expected = [math.log(waves[2].length) > math.log(waves[0].length) for waves in waves_list]
+    assert WavePattern.check_rule_batch(waves_list, rule).tolist() == expected
@@ -0,0 +1,14 @@
+from models.FibonacciAnalyzer import FibonacciAnalyzer
+import numpy as np
+
+
+def test_ratio_quality_cache_is_bounded():
+    analyzer = FibonacciAnalyzer()
+    analyzer._QUALITY_CACHE_SIZE = 100
+
+    for ratio in np.linspace(0.1, 3.0, 1000):
+        analyzer._ratio_quality(float(ratio), analyzer._WAVE3_EXPECTED)
+
+    assert len(analyzer._quality_cache) == 100
+    assert analyzer._ratio_quality(1.0, analyzer._WAVE3_EXPECTED) == \
+        analyzer._calculate_quality_score(analyzer._find_matching_ratios(1.0, analyzer._WAVE3_EXPECTED))